@@ -1,21 +1,52 @@
 import fitz
-from GeminiLLM import GeminiLLM
+from functools import lru_cache
+from GeminiLLM import get_gemini, ERROR_PREFIX
+from llm_cache import SemanticCache
+
+# summarize() only sends this many characters to the model
+SUMMARY_CHAR_LIMIT = 8000
+# ...and never reads past this many pages looking for them (scanned/image-only PDFs)
+SUMMARY_PAGE_LIMIT = 30
+
+
+@lru_cache(maxsize=1)
+def _get_semantic_cache():
+    """Shared semantic cache, or None if it can't be set up (missing deps, model download/load failure)."""
+    try:
+        return SemanticCache()
+    except Exception as e:
+        if not isinstance(e, ImportError):
+            print(f"Semantic cache unavailable, calling Gemini directly: {e}")
+        return None
 
 class ContentExtractor:
     def __init__(self, pdf_path):
         self.pdf_path = pdf_path
 
     def extract_text(self):
-        """Extract raw text from PDF."""
-        doc = fitz.open(self.pdf_path)
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        return text
+        """Extract raw text from PDF, stopping once enough text for a summary is read."""
+        parts, total = [], 0
+        with fitz.open(self.pdf_path) as doc:
+            for i in range(min(SUMMARY_PAGE_LIMIT, doc.page_count)):
+                # Plain prose is enough for summarizing, so skip ligature/whitespace
+                # preservation, mediabox clipping and layout sorting
+                page_text = doc.load_page(i).get_text("text", flags=0, sort=False)
+                parts.append(page_text)
+                total += len(page_text)
+                if total >= SUMMARY_CHAR_LIMIT:
+                    break
+        return "".join(parts)[:SUMMARY_CHAR_LIMIT]
 
     def summarize(self, text):
         """Summarize PDF content into 20s explainer format."""
-        model = GeminiLLM()
+        excerpt = text[:SUMMARY_CHAR_LIMIT]
+        semantic_cache = _get_semantic_cache()
+        if semantic_cache is not None:
+            cached = semantic_cache.get(excerpt)
+            if cached is not None:
+                return cached
+
+        model = get_gemini()
         prompt = f"""
         Summarize this PDF text into a short, engaging script outline suitable for a 20-second YouTube short.
         Include:
@@ -26,10 +57,12 @@ class ContentExtractor:
         - Citation text (based on context)
         
         Text:
-        {text[:8000]}  # limit to keep under token cap
+        {excerpt}  # limit to keep under token cap
         """
-        response = model.generate_content(prompt)
-        return response.text
+        summary = model.generate_response(prompt)
+        if semantic_cache is not None and not summary.startswith(ERROR_PREFIX):
+            semantic_cache.set(excerpt, summary)
+        return summary
 
     def run(self):
         pdf_text = self.extract_text()
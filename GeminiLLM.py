@@ -1,11 +1,15 @@
 import google.generativeai as genai
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
 from pathlib import Path
+from llm_cache import LLMCache
 env_path = Path(__file__).parent / ".env"
 if env_path.exists():
     load_dotenv(env_path)
 
+ERROR_PREFIX = "Error generating response"
+
 class GeminiLLM:
     """
     Gemini Flash 2.0 integration for reasoning and response generation.
@@ -16,10 +20,12 @@ class GeminiLLM:
         api_key = os.getenv("GEMINI_KEY")
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel('gemini-2.0-flash-exp')
+        self.cache = LLMCache()
 
     def generate_response(self, prompt: str) -> str:
         """
         Generate response using Gemini model.
+        Responses are served from the local cache when available.
 
         Args:
             prompt (str): Input prompt for the model
@@ -27,8 +33,20 @@ class GeminiLLM:
         Returns:
             str: Generated response
         """
+        key = LLMCache.make_key(self.model.model_name, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
         try:
             response = self.model.generate_content(prompt)
+            self.cache.set(key, response.text)
             return response.text
         except Exception as e:
-            return f"Error generating response: {str(e)}"
\ No newline at end of file
+            return f"{ERROR_PREFIX}: {str(e)}"
+
+
+@lru_cache(maxsize=1)
+def get_gemini() -> GeminiLLM:
+    """Process-wide GeminiLLM, so the API client and cache are set up only once."""
+    return GeminiLLM()
@@ -1,3 +1,4 @@
+from concurrent.futures import ThreadPoolExecutor
 from ContentExtractor import ContentExtractor
 from ScriptWriter import ScriptWriter
 from VisualMaker import VisualsMaker
@@ -19,13 +20,13 @@ class PDFToShortPipeline:
         script = writer.write_script()
         print(f"📝 Script:\n{script}\n")
 
+        # Visuals and voiceover only depend on the script, so produce them side by side
         print("🎨 Generating visuals...")
-        visuals = VisualsMaker(script)
-        video_path = visuals.generate_video()
-
         print("🎙️ Generating voiceover...")
-        narrator = Narrator(script)
-        audio_path = narrator.synthesize_audio()
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            video_future = ex.submit(VisualsMaker(script).generate_video)
+            audio_future = ex.submit(Narrator(script).synthesize_audio)
+            video_path, audio_path = video_future.result(), audio_future.result()
 
         print("🎬 Composing final video...")
         citation = "Source: " + "Extracted from PDF"
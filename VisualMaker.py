@@ -1,4 +1,4 @@
-import os
+import subprocess
 
 class VisualsMaker:
     def __init__(self, script, output_path="visual.mp4"):
@@ -14,9 +14,14 @@ class VisualsMaker:
           - Any text-to-video tool
         For now, just create a placeholder white video.
         """
-        os.system(
-            f"ffmpeg -f lavfi -i color=c=white:s=1280x720:d=20 "
-            f"-vf drawtext=\"text='Doodle Animation Placeholder':fontcolor=black:fontsize=40:x=(w-text_w)/2:y=(h-text_h)/2\" "
-            f"{self.output_path}"
-        )
+        subprocess.run([
+            "ffmpeg", "-y",
+            "-f", "lavfi", "-i", "color=c=white:s=1280x720:d=20",
+            "-vf", "drawtext=text='Doodle Animation Placeholder':fontcolor=black:fontsize=40:x=(w-text_w)/2:y=(h-text_h)/2",
+            # Static placeholder: cheapest x264 settings. Only Composer reads it,
+            # so write a fragmented MP4 instead of paying faststart's moov rewrite
+            "-c:v", "libx264", "-preset", "ultrafast", "-tune", "stillimage", "-crf", "28",
+            "-pix_fmt", "yuv420p", "-movflags", "+frag_keyframe+empty_moov",
+            self.output_path,
+        ], check=True)
         return self.output_path
\ No newline at end of file
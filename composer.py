@@ -1,4 +1,6 @@
-from moviepy.editor import VideoFileClip, AudioFileClip, CompositeVideoClip, TextClip
+import os
+import subprocess
+import tempfile
 
 class Composer:
     def __init__(self, video_path, audio_path, citation, output_path="final.mp4"):
@@ -8,13 +10,33 @@ class Composer:
         self.citation = citation
 
     def merge(self):
-        video = VideoFileClip(self.video_path)
-        audio = AudioFileClip(self.audio_path)
-        video = video.set_audio(audio)
+        """Mux narration onto the video and burn in the citation with a single ffmpeg pass."""
+        # drawtext reads the citation from a file so it needs no filtergraph escaping
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as f:
+            f.write(self.citation)
+            # escape ':' for both the filtergraph and the option parser (Windows drive letters)
+            textfile = f.name.replace("\\", "/").replace(":", "\\\\:")
 
-        txt = TextClip(self.citation, fontsize=30, color='black') \
-            .set_duration(video.duration) \
-            .set_position(("center", "bottom"))
-        final = CompositeVideoClip([video, txt])
-        final.write_videofile(self.output_path, fps=24)
+        drawtext = (
+            f"drawtext=textfile={textfile}:expansion=none"
+            ":fontcolor=black:fontsize=30:x=(w-tw)/2:y=h-60"
+        )
+        cmd = [
+            "ffmpeg", "-y",
+            "-i", self.video_path,
+            "-i", self.audio_path,
+            "-map", "0:v:0", "-map", "1:a:0",
+            "-vf", drawtext,
+            "-r", "24",
+            "-c:v", "libx264", "-preset", "veryfast", "-crf", "23",
+            "-threads", "0",
+            "-c:a", "aac",
+            "-shortest",
+            "-movflags", "+faststart",
+            self.output_path,
+        ]
+        try:
+            subprocess.run(cmd, check=True)
+        finally:
+            os.remove(f.name)
         return self.output_path
\ No newline at end of file
@@ -0,0 +1,222 @@
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import sqlite3
+import time
+from functools import lru_cache
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # optional; stdlib json is the fallback
+    orjson = None
+
+DEFAULT_DB_PATH = Path(__file__).parent / ".llm_cache.sqlite3"
+DEFAULT_TTL = 7 * 24 * 60 * 60  # one week
+
+
+class LLMCache:
+    """
+    Persistent SQLite-backed cache for LLM responses.
+    Entries are keyed on a hash of (model, prompt) and expire after `ttl` seconds.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, ttl=DEFAULT_TTL):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT, ts INTEGER)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str) -> str:
+        """Deterministic cache key for a (model, prompt) pair."""
+        payload = json.dumps({"model": model_name, "prompt": prompt}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Look up a cached response.
+
+        Args:
+            key (str): Cache key from `make_key`
+
+        Returns:
+            str | None: Cached response, or None on miss/expiry
+        """
+        row = self.conn.execute(
+            "SELECT response FROM responses WHERE key = ? AND ts >= ?",
+            (key, int(time.time()) - self.ttl),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def set(self, key: str, value: str):
+        """Store a response under `key`, refreshing its timestamp."""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, ts) VALUES (?, ?, ?)",
+            (key, value, int(time.time())),
+        )
+        self.conn.commit()
+
+
+def _dumps(obj) -> bytes:
+    """Serialize to JSON bytes, in C via orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
+
+def _loads(data: bytes):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _write_atomic(path: Path, data: bytes):
+    """Write via a temp file and rename, so a crash never leaves a truncated file."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+DEFAULT_SEMANTIC_PATH = Path(__file__).parent / ".semantic_cache"
+DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+# ONNX exports published alongside the default model: int8 dynamic-quantized
+# (AVX2 kernels) and plain FP32 for every other CPU
+DEFAULT_QUANTIZED_ONNX_FILE = "onnx/model_quint8_avx2.onnx"
+DEFAULT_ONNX_FILE = "onnx/model.onnx"
+# The encoder truncates its input (256 tokens, ~1000 characters, for MiniLM),
+# so longer texts are embedded in windows of this size and averaged
+EMBED_WINDOW_CHARS = 1000
+
+
+@lru_cache(maxsize=1)
+def _cpu_has_avx2() -> bool:
+    """True only when the CPU is known to support AVX2 (read from /proc/cpuinfo on Linux)"""
+    if platform.machine().lower() not in ("x86_64", "amd64"):
+        return False
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            return any(line.startswith("flags") and " avx2" in line for line in f)
+    except OSError:  # not Linux: can't tell, so don't assume it
+        return False
+
+
+def _encoder_kwargs(model_name: str) -> dict:
+    """
+    SentenceTransformer options that run the model through onnxruntime when
+    `optimum` and `onnxruntime` are installed (int8 weights for the default
+    model on AVX2 CPUs); otherwise the stock PyTorch FP32 backend is used.
+    """
+    if importlib.util.find_spec("onnxruntime") is None or importlib.util.find_spec("optimum") is None:
+        return {}
+    kwargs = {"backend": "onnx"}
+    if model_name == DEFAULT_EMBEDDING_MODEL:
+        onnx_file = DEFAULT_QUANTIZED_ONNX_FILE if _cpu_has_avx2() else DEFAULT_ONNX_FILE
+        kwargs["model_kwargs"] = {"file_name": onnx_file}
+    return kwargs
+
+
+def _load_encoder(model_name: str):
+    """Load the embedding model, falling back to the PyTorch backend if the ONNX load fails"""
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = _encoder_kwargs(model_name)
+    if kwargs:
+        try:
+            return SentenceTransformer(model_name, **kwargs)
+        except Exception:  # sentence-transformers < 3.2 (no `backend`), missing export, ...
+            pass
+    return SentenceTransformer(model_name)
+
+
+class SemanticCache:
+    """
+    Similarity-based cache for summaries of near-duplicate inputs.
+    Inputs are embedded with a small local model; a lookup returns the stored
+    response whose input has cosine similarity >= `threshold` with the query.
+    Requires `numpy` and `sentence-transformers` (raises ImportError otherwise).
+    """
+
+    def __init__(self, path=DEFAULT_SEMANTIC_PATH, threshold=0.92,
+                 model_name=DEFAULT_EMBEDDING_MODEL):
+        import numpy as np
+
+        self._np = np
+        self.encoder = _load_encoder(model_name)
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        # Vectors and responses share one file, so one rename keeps them in step
+        self.store_path = Path(f"{path}.npz")
+        # Memoise exact strings so a miss followed by set() encodes the text once
+        self._embed = lru_cache(maxsize=256)(self._embed)
+
+        dim = self.encoder.get_sentence_embedding_dimension()
+        self.embeddings = np.empty((0, dim), dtype=np.float32)
+        self.responses = []
+        if self.store_path.exists():
+            self._load()
+
+    def _load(self):
+        """Read the store; a damaged or mismatched one is dropped rather than trusted."""
+        try:
+            with self._np.load(self.store_path) as store:
+                embeddings = store["embeddings"]
+                responses = _loads(store["responses"].tobytes())
+        except Exception:
+            return
+        if len(embeddings) == len(responses) and embeddings.shape[1:] == self.embeddings.shape[1:]:
+            self.embeddings, self.responses = embeddings, responses
+
+    def _embed(self, text: str):
+        """Unit vector for the whole text: the mean of its per-window embeddings."""
+        windows = [text[i:i + EMBED_WINDOW_CHARS]
+                   for i in range(0, len(text), EMBED_WINDOW_CHARS)] or [text]
+        vectors = self.encoder.encode(windows, normalize_embeddings=True)
+        mean = vectors.mean(axis=0, keepdims=True)
+        mean /= max(float(self._np.linalg.norm(mean)), 1e-12)
+        return mean.astype(self._np.float32)
+
+    def get(self, text: str):
+        """
+        Look up the response stored for the most similar previous input.
+
+        Args:
+            text (str): Input text to match
+
+        Returns:
+            str | None: Cached response, or None if nothing is similar enough
+        """
+        if not self.responses:
+            self.misses += 1
+            return None
+        # Embeddings are L2-normalised, so the dot product is cosine similarity
+        scores = self.embeddings @ self._embed(text)[0]
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.responses[best]
+
+    def set(self, text: str, value: str):
+        """Store `value` as the response for `text` and persist to disk."""
+        self.embeddings = self._np.vstack([self.embeddings, self._embed(text)])
+        self.responses.append(value)
+        store = io.BytesIO()
+        self._np.savez(
+            store,
+            embeddings=self.embeddings,
+            responses=self._np.frombuffer(_dumps(self.responses), dtype=self._np.uint8),
+        )
+        _write_atomic(self.store_path, store.getvalue())
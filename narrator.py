@@ -1,12 +1,64 @@
+import os
+import re
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
 from gtts import gTTS
 
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+@lru_cache(maxsize=1)
+def get_piper_voice():
+    """Local Piper voice from $PIPER_VOICE_MODEL, or None if piper-tts or the model is missing."""
+    model_path = os.getenv("PIPER_VOICE_MODEL")
+    if not model_path or not os.path.exists(model_path):
+        return None
+    try:
+        from piper import PiperVoice
+    except ImportError:
+        return None
+    return PiperVoice.load(model_path)
+
+
+def _tts_one(text, lang='en'):
+    """Synthesize one chunk of text and return the MP3 bytes."""
+    buf = BytesIO()
+    gTTS(text=text, lang=lang).write_to_fp(buf)
+    return buf.getvalue()
+
+
 class Narrator:
     def __init__(self, script, output_audio="voice.mp3"):
         self.script = script
         self.output_audio = output_audio
 
     def synthesize_audio(self):
-        """Use gTTS for simplicity."""
-        tts = gTTS(text=self.script, lang='en')
-        tts.save(self.output_audio)
+        """Synthesize locally with Piper when available, else gTTS with sentences requested concurrently."""
+        voice = get_piper_voice()
+        if voice is not None:
+            return self._synthesize_piper(voice)
+
+        sentences = [s for s in _SENTENCE_END.split(self.script.strip()) if s] or [self.script]
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            parts = list(ex.map(_tts_one, sentences))
+        # gTTS output is a plain stream of MP3 frames, so parts concatenate cleanly
+        with open(self.output_audio, 'wb') as f:
+            for part in parts:
+                f.write(part)
+        return self.output_audio
+
+    def _synthesize_piper(self, voice):
+        """Run Piper in-process (no network hop) and transcode its WAV output in one ffmpeg pass."""
+        wav_buf = BytesIO()
+        with wave.open(wav_buf, 'wb') as wav_file:
+            voice.synthesize(self.script, wav_file)
+        subprocess.run(
+            ["ffmpeg", "-y", "-f", "wav", "-i", "pipe:0",
+             # Re-encoded to AAC by Composer, so a cheap VBR intermediate is enough
+             "-c:a", "libmp3lame", "-q:a", "5", self.output_audio],
+            input=wav_buf.getvalue(), check=True, capture_output=True,
+        )
         return self.output_audio
\ No newline at end of file
@@ -1,4 +1,4 @@
-from GeminiLLM import GeminiLLM
+from GeminiLLM import get_gemini
 
 class ScriptWriter:
     def __init__(self, summary):
@@ -6,7 +6,7 @@ class ScriptWriter:
 
     def write_script(self):
         """Generate final 20-second script from summary."""
-        model = GeminiLLM()
+        model = get_gemini()
         prompt = f"""
         Create a conversational, engaging 20-second voiceover script for a YouTube short
         based on this summary. Use natural language and storytelling tone.
@@ -15,5 +15,4 @@ class ScriptWriter:
         Summary:
         {self.summary}
         """
-        response = model.generate_content(prompt)
-        return response.text
\ No newline at end of file
+        return model.generate_response(prompt)
\ No newline at end of file
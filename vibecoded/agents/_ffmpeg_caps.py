@@ -0,0 +1,76 @@
+"""
+agents/_ffmpeg_caps.py
+Probes and caches what the local FFmpeg build supports
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from functools import lru_cache
+from typing import Dict, List, Set
+
+CAPS_CACHE_PATH = os.path.join("temp_processing", "ffmpeg_caps.json")
+
+
+@lru_cache(maxsize=1)
+def get_caps() -> Dict[str, Set[str]]:
+    """
+    Encoders of the FFmpeg on PATH
+    
+    Probed once and persisted as JSON, keyed on the binary's path, size and
+    mtime, so later runs skip the probe process until FFmpeg changes.
+    
+    Returns:
+        Dictionary with an 'encoders' name set (empty if FFmpeg is not installed)
+    """
+    empty = {'encoders': set()}
+    ffmpeg_path = shutil.which('ffmpeg')
+    if not ffmpeg_path:
+        return empty
+    
+    stat = os.stat(ffmpeg_path)
+    binary = [ffmpeg_path, stat.st_size, stat.st_mtime]
+    
+    try:
+        with open(CAPS_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+        if cached.get('binary') == binary:
+            return {key: set(cached[key]) for key in empty}
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    try:
+        caps = {'encoders': _parse_encoders(_run_probe('-encoders'))}
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return empty
+    
+    try:
+        os.makedirs(os.path.dirname(CAPS_CACHE_PATH), exist_ok=True)
+        with open(CAPS_CACHE_PATH, 'w') as f:
+            json.dump({'binary': binary, **{key: sorted(names) for key, names in caps.items()}}, f)
+    except OSError:
+        pass  # Cache is an optimisation only
+    
+    return caps
+
+
+def _run_probe(flag: str) -> List[str]:
+    """Output lines of `ffmpeg -hide_banner <flag>`"""
+    result = subprocess.run(
+        ['ffmpeg', '-hide_banner', flag],
+        capture_output=True, text=True, check=True
+    )
+    return result.stdout.splitlines()
+
+
+def _parse_encoders(lines: List[str]) -> Set[str]:
+    """Encoder names from the rows after the ' ------' legend separator"""
+    names = set()
+    in_table = False
+    for line in lines:
+        if line.strip() == '------':
+            in_table = True
+        elif in_table and len(line.split()) >= 2:
+            names.add(line.split()[1])
+    return names
@@ -3,12 +3,22 @@ agents/content_extractor.py
 Extracts text, metadata, and structure from PDF files
 """
 
-import PyPDF2
+import fitz
 import re
-from typing import Dict, List
+from typing import Dict, Iterator, List
 from pathlib import Path
 
 
+# Common section headers, combined so each line needs a single match:
+# markdown headers, title case with colon, numbered sections, ALL CAPS
+_SECTION_HEADER = re.compile(
+    r'^(?:#+\s+.+'
+    r'|[A-Z][A-Za-z\s]{2,30}:'
+    r'|\d+\.\s+[A-Z].+'
+    r'|[A-Z\s]{5,30})$'
+)
+
+
 class ContentExtractor:
     """Extracts and structures content from PDF documents"""
     
@@ -33,21 +43,14 @@ class ContentExtractor:
         if pdf_path.suffix.lower() not in self.supported_formats:
             raise ValueError(f"Unsupported format: {pdf_path.suffix}")
         
-        # Extract text and metadata
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            
-            # Extract metadata
-            metadata = pdf_reader.metadata or {}
-            
-            # Extract text from all pages
-            text_parts = []
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                text = page.extract_text()
-                if text.strip():
-                    text_parts.append(f"[Page {page_num}]\n{text}")
+        # Extract text and metadata (PyMuPDF parses far faster than PyPDF2)
+        with fitz.open(str(pdf_path)) as doc:
+            # Extract metadata; missing fields come back as empty strings
+            metadata = doc.metadata or {}
+            num_pages = doc.page_count
             
-            full_text = "\n\n".join(text_parts)
+            # Extract text from all pages, joined straight from the page generator
+            full_text = "\n\n".join(self._page_texts(doc))
         
         # Generate citations
         citations = self._extract_citations(metadata, pdf_path.name)
@@ -58,16 +61,36 @@ class ContentExtractor:
         return {
             'text': full_text,
             'metadata': {
-                'title': metadata.get('/Title', pdf_path.stem),
-                'author': metadata.get('/Author', 'Unknown'),
-                'subject': metadata.get('/Subject', ''),
-                'num_pages': len(pdf_reader.pages)
+                'title': metadata.get('title') or pdf_path.stem,
+                'author': metadata.get('author') or 'Unknown',
+                'subject': metadata.get('subject') or '',
+                'num_pages': num_pages
             },
             'citations': citations,
             'sections': sections,
             'filename': pdf_path.name
         }
     
+    def iter_pages(self, pdf_path: str) -> Iterator[str]:
+        """
+        Yield the text of each non-empty page without building the whole document text
+        
+        Args:
+            pdf_path: Path to PDF file
+            
+        Yields:
+            "[Page N]" prefixed text for each page that has any text
+        """
+        with fitz.open(str(pdf_path)) as doc:
+            yield from self._page_texts(doc)
+    
+    def _page_texts(self, doc) -> Iterator[str]:
+        """Lazily read each page's text, skipping blank pages"""
+        for page_num, page in enumerate(doc, 1):
+            text = page.get_text("text")
+            if text.strip():
+                yield f"[Page {page_num}]\n{text}"
+    
     def _extract_citations(self, metadata: Dict, filename: str) -> List[Dict]:
         """Generate citation information from PDF metadata"""
         citations = []
@@ -75,8 +98,8 @@ class ContentExtractor:
         # Primary citation
         citation = {
             'type': 'document',
-            'title': metadata.get('/Title', filename),
-            'author': metadata.get('/Author', 'Unknown'),
+            'title': metadata.get('title') or filename,
+            'author': metadata.get('author') or 'Unknown',
             'source': filename
         }
         citations.append(citation)
@@ -87,14 +110,6 @@ class ContentExtractor:
         """Identify major sections in the document"""
         sections = []
         
-        # Look for common section headers
-        section_patterns = [
-            r'^#+\s+(.+)$',  # Markdown headers
-            r'^([A-Z][A-Za-z\s]{2,30}):$',  # Title case headers with colon
-            r'^(\d+\.)\s+([A-Z].+)$',  # Numbered sections
-            r'^([A-Z\s]{5,30})$',  # ALL CAPS headers
-        ]
-        
         lines = text.split('\n')
         current_section = None
         section_text = []
@@ -104,24 +119,23 @@ class ContentExtractor:
             if not line:
                 continue
             
-            # Check if line matches section pattern
-            is_header = False
-            for pattern in section_patterns:
-                if re.match(pattern, line):
-                    # Save previous section
-                    if current_section:
-                        sections.append({
-                            'title': current_section,
-                            'text': '\n'.join(section_text),
-                            'start_line': i - len(section_text)
-                        })
-                    
-                    current_section = line
-                    section_text = []
-                    is_header = True
-                    break
+            # Every header starts with '#', a capital or a digit; skip the regex for body text
+            first = line[0]
+            is_header = (first == '#' or first.isupper() or first.isdigit()) and \
+                _SECTION_HEADER.match(line) is not None
             
-            if not is_header and current_section:
+            if is_header:
+                # Save previous section
+                if current_section:
+                    sections.append({
+                        'title': current_section,
+                        'text': '\n'.join(section_text),
+                        'start_line': i - len(section_text)
+                    })
+                
+                current_section = line
+                section_text = []
+            elif current_section:
                 section_text.append(line)
         
         # Add final section
@@ -3,11 +3,56 @@ agents/narrator.py
 Generates narration audio from script using TTS
 """
 
+import asyncio
+import hashlib
+import io
 import os
-from typing import Dict, List
+import re
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from gtts import gTTS
 import subprocess
 
+from .video_composer import VideoComposer
+
+try:
+    import edge_tts
+except ImportError:  # optional: falls back to gTTS
+    edge_tts = None
+
+EDGE_TTS_VOICE = "en-US-AriaNeural"
+
+# Final "time=HH:MM:SS.xx" progress report from an ffmpeg decode
+_FFMPEG_TIME = re.compile(r'time=(\d+):(\d+):(\d+(?:\.\d+)?)')
+
+
+@lru_cache(maxsize=1)
+def _get_piper_voice():
+    """Load the local Piper voice once; None if piper-tts or PIPER_VOICE_MODEL is unavailable"""
+    model_path = os.environ.get('PIPER_VOICE_MODEL')
+    if not model_path or not os.path.exists(model_path):
+        return None
+    try:
+        from piper import PiperVoice
+    except ImportError:
+        return None
+    return PiperVoice.load(model_path)
+
+
+def _content_key(text: str) -> str:
+    """Short stable hash naming the audio generated for text"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _write_atomic(path: str, data: bytes):
+    """Write via a temporary name so an interrupted write is never picked up as cached"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
 
 class Narrator:
     """Generates narration audio for video"""
@@ -16,12 +61,18 @@ class Narrator:
         self.output_dir = "temp_processing/audio"
         os.makedirs(self.output_dir, exist_ok=True)
         
-    def generate_audio(self, script: Dict) -> str:
+    def prewarm(self):
+        """Load the local TTS voice now rather than on the first synthesis"""
+        _get_piper_voice()
+    
+    def generate_audio(self, script: Dict, target_duration: float = None) -> str:
         """
         Generate narration audio from script
         
         Args:
             script: Script dictionary with scenes
+            target_duration: Seconds the narration must fit in
+                (defaults to the composed video length: scenes plus intro and outro)
             
         Returns:
             Path to generated audio file
@@ -50,30 +101,38 @@ class Narrator:
         # Combine narration
         full_narration = ' '.join(narration_parts)
         
+        if target_duration is None:
+            # The narration plays over the whole video, title and closing cards included
+            target_duration = (
+                VideoComposer.INTRO_DURATION
+                + sum(scene.get('duration', 10) for scene in script.get('scenes', []))
+                + VideoComposer.OUTRO_DURATION
+            )
+        
+        # Named by content, so narration already produced for this text is reused
+        key = _content_key(f"{target_duration}|{full_narration}")
+        cached_path = self._find_cached(f"narration_{key}")
+        if cached_path:
+            return cached_path
+        
         print(f"Generating audio for {len(full_narration)} characters of narration...")
         
-        # Generate audio using gTTS (Google Text-to-Speech)
-        # For better quality, consider using: pyttsx3, edge-tts, or Coqui TTS
+        # Generate audio using local Piper TTS if configured, else edge-tts or gTTS
+        # For better quality, consider using: pyttsx3 or Coqui TTS
         output_path = os.path.join(self.output_dir, "narration.mp3")
         
         try:
-            # Method 1: gTTS (simple, free, requires internet)
-            tts = gTTS(text=full_narration, lang='en', slow=False)
-            tts.save(output_path)
+            audio, ext = self._synthesize(full_narration)
+            tempo = self._fit_tempo(audio, target_duration)
             
-            # Optional: Adjust speed if needed using ffmpeg
-            adjusted_path = os.path.join(self.output_dir, "narration_adjusted.mp3")
-            try:
-                subprocess.run([
-                    'ffmpeg', '-i', output_path,
-                    '-filter:a', 'atempo=1.1',  # 10% faster
-                    '-vn', '-y',
-                    adjusted_path
-                ], check=True, capture_output=True)
+            # Only re-encode when the narration has to be sped up to fit
+            adjusted_path = os.path.join(self.output_dir, f"narration_{key}.mp3")
+            if tempo == 1.0 or not self._apply_tempo(audio, tempo, adjusted_path):
+                # Already fits, or ffmpeg not available/failed: use original
+                output_path = os.path.join(self.output_dir, f"narration_{key}.{ext}")
+                _write_atomic(output_path, audio)
+            else:
                 output_path = adjusted_path
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                # ffmpeg not available or failed, use original
-                pass
             
         except Exception as e:
             print(f"TTS generation failed: {e}")
@@ -82,6 +141,98 @@ class Narrator:
         
         return output_path
     
+    def _fit_tempo(self, audio: bytes, target_duration: float) -> float:
+        """atempo factor that fits the audio into target_duration (1.0 if it already fits)"""
+        duration = self._measure_duration(audio)
+        if not duration or not target_duration or duration <= target_duration:
+            return 1.0
+        # A single atempo instance accepts 0.5-2.0
+        return min(duration / target_duration, 2.0)
+    
+    def _measure_duration(self, audio: bytes) -> float:
+        """Duration of in-memory audio in seconds (0.0 if unknown)"""
+        try:
+            result = subprocess.run(
+                ['ffmpeg', '-i', 'pipe:0', '-f', 'null', '-'],
+                input=audio, capture_output=True, check=True
+            )
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            return 0.0
+        matches = _FFMPEG_TIME.findall(result.stderr.decode('utf-8', 'replace'))
+        if not matches:
+            return 0.0
+        hours, minutes, seconds = matches[-1]
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    
+    def _apply_tempo(self, audio: bytes, tempo: float, adjusted_path: str) -> Optional[str]:
+        """Speed up audio with ffmpeg, fed from memory; returns adjusted_path or None on failure"""
+        # Encode under a temporary name so a failed run never leaves a reusable file
+        tmp_path = f"{adjusted_path}.{os.getpid()}.tmp"
+        try:
+            subprocess.run([
+                'ffmpeg', '-i', 'pipe:0',
+                '-filter:a', f'atempo={tempo:.3f}',
+                # Intermediate track (re-encoded at final mux): cheap VBR is plenty
+                '-c:a', 'libmp3lame', '-q:a', '5',
+                '-vn', '-f', 'mp3', '-y',
+                tmp_path
+            ], input=audio, check=True, capture_output=True)
+            os.replace(tmp_path, adjusted_path)
+            return adjusted_path
+        except (subprocess.CalledProcessError, FileNotFoundError):
+            # ffmpeg not available or failed
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return None
+    
+    def _find_cached(self, stem: str) -> Optional[str]:
+        """Existing audio file for a content-addressed stem, marked as recently used"""
+        for ext in ('mp3', 'wav'):
+            path = os.path.join(self.output_dir, f"{stem}.{ext}")
+            if os.path.exists(path):
+                os.utime(path)
+                return path
+        return None
+    
+    def _synthesize(self, text: str) -> Tuple[bytes, str]:
+        """
+        Synthesize speech in memory
+        
+        Piper runs in-process with no network round-trip. Otherwise edge-tts
+        streams the whole text over one websocket; gTTS is the last resort
+        (it sends ~100 character chunks as sequential HTTP requests).
+        
+        Returns:
+            Tuple of (audio bytes, file extension)
+        """
+        voice = _get_piper_voice()
+        buf = io.BytesIO()
+        if voice is not None:
+            with wave.open(buf, 'wb') as wav_file:
+                voice.synthesize(text, wav_file)
+            return buf.getvalue(), 'wav'
+        
+        if edge_tts is not None:
+            try:
+                asyncio.run(self._stream_edge_tts(text, buf))
+                return buf.getvalue(), 'mp3'
+            except Exception as e:
+                print(f"edge-tts failed, falling back to gTTS: {e}")
+                buf = io.BytesIO()
+        
+        # gTTS (simple, free, requires internet)
+        gTTS(text=text, lang='en', slow=False).write_to_fp(buf)
+        return buf.getvalue(), 'mp3'
+    
+    async def _stream_edge_tts(self, text: str, buf: io.BytesIO):
+        """Collect edge-tts MP3 audio chunks into buf"""
+        communicate = edge_tts.Communicate(text, EDGE_TTS_VOICE)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                buf.write(chunk["data"])
+        if not buf.tell():
+            raise RuntimeError("edge-tts returned no audio")
+    
     def _create_silent_audio(self, duration: int) -> str:
         """Create silent audio file as fallback"""
         output_path = os.path.join(self.output_dir, "narration.mp3")
@@ -91,6 +242,7 @@ class Narrator:
                 'ffmpeg', '-f', 'lavfi', '-i', 
                 f'anullsrc=r=44100:cl=stereo',
                 '-t', str(duration),
+                '-c:a', 'libmp3lame', '-q:a', '5',
                 '-y', output_path
             ], check=True, capture_output=True)
         except (subprocess.CalledProcessError, FileNotFoundError):
@@ -111,18 +263,41 @@ class Narrator:
         """
         audio_files = {}
         
+        tasks = []
         for scene in script.get('scenes', []):
             scene_num = scene.get('scene_number', 0)
             narration = scene.get('narration', '')
             
             if narration:
-                output_path = os.path.join(self.output_dir, f"scene_{scene_num:02d}.mp3")
-                
+                tasks.append((scene_num, narration))
+        
+        if not tasks:
+            return audio_files
+        
+        # Each scene is an independent network round-trip, so request them concurrently
+        with ThreadPoolExecutor(max_workers=min(len(tasks), 8)) as executor:
+            futures = {
+                executor.submit(self._synthesize_scene, scene_num, narration): scene_num
+                for scene_num, narration in tasks
+            }
+            for future in as_completed(futures):
+                scene_num = futures[future]
                 try:
-                    tts = gTTS(text=narration, lang='en', slow=False)
-                    tts.save(output_path)
-                    audio_files[scene_num] = output_path
+                    audio_files[scene_num] = future.result()
                 except Exception as e:
                     print(f"Failed to generate audio for scene {scene_num}: {e}")
         
-        return audio_files
\ No newline at end of file
+        # Completion order is arbitrary; hand back scenes in order
+        return dict(sorted(audio_files.items()))
+    
+    def _synthesize_scene(self, scene_num: int, narration: str) -> str:
+        """Synthesize one scene's narration to a file and return its path"""
+        stem = f"scene_{_content_key(narration)}"
+        cached_path = self._find_cached(stem)
+        if cached_path:
+            return cached_path
+        
+        audio, ext = self._synthesize(narration)
+        output_path = os.path.join(self.output_dir, f"{stem}.{ext}")
+        _write_atomic(output_path, audio)
+        return output_path
\ No newline at end of file
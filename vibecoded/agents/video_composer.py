@@ -5,19 +5,97 @@ Composes final video using FFmpeg with animations and effects
 
 import os
 import subprocess
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Tuple
 from PIL import Image, ImageDraw, ImageFont
 import json
 
+from ._ffmpeg_caps import get_caps
+
+
+@lru_cache(maxsize=32)
+def _load_font(path: str, size: int):
+    """Load a TrueType font once per (path, size); falls back to Pillow's default font"""
+    try:
+        return ImageFont.truetype(path, size)
+    except (OSError, ImportError):
+        return ImageFont.load_default()
+
+
+# Seconds a one-frame hardware encoder test may take before the encoder is skipped
+_HW_PROBE_TIMEOUT = 10
+
+# Hardware H.264 encoders in order of preference
+_HW_ENCODERS = ['h264_nvenc', 'h264_qsv', 'h264_videotoolbox']
+
+# x264 preset names mapped onto NVENC's p1 (fastest) .. p7 (best) scale
+_NVENC_PRESETS = {
+    'ultrafast': 'p1', 'superfast': 'p1', 'veryfast': 'p2', 'faster': 'p3',
+    'fast': 'p4', 'medium': 'p5', 'slow': 'p6', 'slower': 'p7', 'veryslow': 'p7',
+}
+_FAST_PRESETS = {'ultrafast', 'superfast', 'veryfast'}
+
+
+@lru_cache(maxsize=1)
+def _detect_hw_encoder():
+    """
+    Find a working hardware H.264 encoder once per process
+    
+    An encoder can be compiled into FFmpeg without a device to run it on,
+    so each candidate in the cached encoder list gets a one-frame test encode.
+    
+    Returns:
+        Encoder name, or None to stay on the software encoder
+    """
+    encoders = get_caps()['encoders']
+    
+    for encoder in _HW_ENCODERS:
+        if encoder not in encoders:
+            continue
+        try:
+            probe = subprocess.run(
+                ['ffmpeg', '-v', 'error', '-f', 'lavfi', '-i', 'color=s=256x256:d=0.1',
+                 '-frames:v', '1', '-c:v', encoder, '-f', 'null', '-'],
+                capture_output=True, timeout=_HW_PROBE_TIMEOUT
+            )
+        except subprocess.TimeoutExpired:  # hung driver: treat as unavailable
+            continue
+        if probe.returncode == 0:
+            return encoder
+    return None
+
+
+def _hw_encoder_args(encoder: str, preset: str, crf: int) -> List[str]:
+    """Speed and constant-quality flags for a hardware encoder, matching the x264 preset and CRF"""
+    if encoder == 'h264_nvenc':
+        # NVENC's CQ uses the same 0-51 scale as CRF; -b:v 0 lifts the bitrate cap
+        return ['-preset', _NVENC_PRESETS.get(preset, 'p4'),
+                '-rc', 'vbr', '-cq', str(crf), '-b:v', '0']
+    if encoder == 'h264_qsv':
+        # QSV takes x264's preset names from veryfast down; ICQ mode is also 1-51
+        qsv_preset = 'veryfast' if preset in _FAST_PRESETS else preset
+        return ['-preset', qsv_preset, '-global_quality', str(max(crf, 1))]
+    # VideoToolbox: no presets, only real-time priority; -q:v runs 1 (worst) to 100 (best)
+    args = ['-realtime', '1'] if preset in _FAST_PRESETS else []
+    return args + ['-q:v', str(max(1, round(100 - crf * 99 / 51)))]
+
 
 class VideoComposer:
     """Composes final video with animations, audio, and citations"""
     
+    # Seconds the title card and the closing citation card are shown
+    INTRO_DURATION = 3
+    OUTRO_DURATION = 3
+    
     def __init__(self, config):
         self.config = config
         self.temp_dir = "temp_processing/video"
         os.makedirs(self.temp_dir, exist_ok=True)
         
+    def prewarm(self):
+        """Run the one-time FFmpeg capability and hardware encoder probes ahead of compose()"""
+        self._ffmpeg_encode_args()
+    
     def compose(self, script: Dict, visual_assets: Dict, 
                 audio_path: str, output_path: str, citations: List[Dict]) -> str:
         """
@@ -25,7 +103,7 @@ class VideoComposer:
         
         Args:
             script: Script dictionary
-            visual_assets: Dictionary of visual asset paths
+            visual_assets: Dictionary of scene images (or image paths)
             audio_path: Path to narration audio
             output_path: Output video path
             citations: List of citation dictionaries
@@ -35,26 +113,26 @@ class VideoComposer:
         """
         print("Composing final video...")
         
-        # Step 1: Create animated sequences for each scene
-        scene_videos = self._create_scene_animations(script, visual_assets)
+        # Step 1: Draw intro and outro cards (kept in memory, never written to disk)
+        intro_image = self._create_intro(script)
+        outro_image = self._create_outro(script, citations)
         
-        # Step 2: Add intro and outro
-        intro_video = self._create_intro(script)
-        outro_video = self._create_outro(script, citations)
+        # Step 2: Describe intro, scene and outro clips
+        clip_jobs = (
+            [('fade_in', intro_image, self.INTRO_DURATION)]
+            + self._scene_clip_jobs(script, visual_assets)
+            + [('static', outro_image, self.OUTRO_DURATION)]
+        )
         
-        # Step 3: Concatenate all scenes
-        all_videos = [intro_video] + scene_videos + [outro_video]
-        concat_video = self._concatenate_videos(all_videos)
-        
-        # Step 4: Add audio
-        final_video = self._add_audio(concat_video, audio_path, output_path)
+        # Step 3: Animate, concatenate and add audio in one FFmpeg pass
+        final_video = self._render_video(clip_jobs, audio_path, output_path)
         
         print(f"Video composition complete: {final_video}")
         return final_video
     
-    def _create_scene_animations(self, script: Dict, visual_assets: Dict) -> List[str]:
-        """Create animated video clips for each scene"""
-        scene_videos = []
+    def _scene_clip_jobs(self, script: Dict, visual_assets: Dict) -> List[Tuple]:
+        """Build (animation_type, image, duration) jobs for each scene"""
+        jobs = []
         
         for scene in script.get('scenes', []):
             scene_num = scene.get('scene_number', 0)
@@ -65,93 +143,134 @@ class VideoComposer:
                 continue
             
             asset = visual_assets[scene_num]
-            image_path = asset['path']
+            source = asset['image'] if 'image' in asset else asset['path']
             
             # Create animated video from static image
-            video_path = os.path.join(self.temp_dir, f"scene_{scene_num:02d}.mp4")
-            
-            if animation_type == 'draw_on':
-                self._create_draw_on_animation(image_path, video_path, duration)
-            elif animation_type == 'zoom':
-                self._create_zoom_animation(image_path, video_path, duration)
-            elif animation_type == 'fade_in':
-                self._create_fade_animation(image_path, video_path, duration)
-            else:
-                self._create_simple_video(image_path, video_path, duration)
-            
-            scene_videos.append(video_path)
+            jobs.append((animation_type, source, duration))
         
-        return scene_videos
+        return jobs
     
-    def _create_draw_on_animation(self, image_path: str, output_path: str, duration: int):
-        """Create 'drawing on' animation effect"""
-        
-        # Use FFmpeg with custom filter to simulate drawing effect
-        # This creates a reveal animation from top to bottom
-        try:
-            subprocess.run([
-                'ffmpeg',
-                '-loop', '1',
-                '-i', image_path,
-                '-vf', f"crop=iw:ih*t/{duration}:0:0,pad=iw:ih:0:(oh-ih)/2:white",
-                '-t', str(duration),
-                '-r', str(self.config.fps),
-                '-pix_fmt', 'yuv420p',
-                '-y', output_path
-            ], check=True, capture_output=True)
-        except subprocess.CalledProcessError:
-            # Fallback to simple video
-            self._create_simple_video(image_path, output_path, duration)
+    def _ffmpeg_encode_args(self) -> List[str]:
+        """Encoder settings for the video encode, taken from the video config"""
+        # The default software codec is swapped for a hardware encoder when one works
+        if self.config.video_codec == 'libx264':
+            encoder = _detect_hw_encoder()
+            if encoder:
+                return ['-c:v', encoder,
+                        *_hw_encoder_args(encoder, self.config.video_preset, self.config.crf)]
+        
+        return [
+            '-c:v', self.config.video_codec,
+            '-preset', self.config.video_preset,
+            '-crf', str(self.config.crf),
+            '-threads', str(os.cpu_count() or 0),
+        ]
     
-    def _create_zoom_animation(self, image_path: str, output_path: str, duration: int):
-        """Create zoom-in animation"""
+    def _clip_filter(self, animation_type: str, source: str, index: int, duration: int) -> str:
+        """Filter chain that animates the still on pad `source` into the clip labelled [v{index}]"""
+        fps = self.config.fps
+        frames = int(duration * fps)
+        size = f"{self.config.width}x{self.config.height}"
+        
+        if animation_type == 'zoom':
+            # zoompan expands the single decoded still into every output frame
+            chain = f"[{source}]zoompan=z='min(zoom+0.0015,1.2)':d={frames}:s={size}:fps={fps}"
+        else:
+            # Repeat the decoded still rather than re-reading the image for every frame
+            chain = f"[{source}]scale={size},loop=loop={frames - 1}:size=1,setpts=N/({fps}*TB)"
+            if animation_type == 'draw_on':
+                # Reveal from top to bottom by sliding a white cover down off the frame
+                chain = (
+                    f"color=c=white:s={size}:r={fps}:d={duration}[cover{index}];"
+                    f"{chain}[still{index}];"
+                    f"[still{index}][cover{index}]overlay=x=0:y='H*t/{duration}'"
+                )
+            elif animation_type == 'fade_in':
+                chain += ",fade=t=in:st=0:d=1"
         
-        try:
-            subprocess.run([
-                'ffmpeg',
-                '-loop', '1',
-                '-i', image_path,
-                '-vf', f"scale=iw*1.2:ih*1.2,zoompan=z='min(zoom+0.0015,1.2)':d={duration * self.config.fps}:s={self.config.width}x{self.config.height}",
-                '-t', str(duration),
-                '-r', str(self.config.fps),
-                '-pix_fmt', 'yuv420p',
-                '-y', output_path
-            ], check=True, capture_output=True)
-        except subprocess.CalledProcessError:
-            self._create_simple_video(image_path, output_path, duration)
+        return f"{chain},setsar=1,format=yuv420p[v{index}]"
     
-    def _create_fade_animation(self, image_path: str, output_path: str, duration: int):
-        """Create fade-in animation"""
+    def _render_video(self, clip_jobs: List[Tuple], audio_path: str, output_path: str) -> str:
+        """
+        Animate and concatenate all clips and mux in the narration audio in a single FFmpeg pass
         
-        try:
-            subprocess.run([
-                'ffmpeg',
-                '-loop', '1',
-                '-i', image_path,
-                '-vf', f"fade=t=in:st=0:d=1",
-                '-t', str(duration),
-                '-r', str(self.config.fps),
-                '-pix_fmt', 'yuv420p',
-                '-y', output_path
-            ], check=True, capture_output=True)
-        except subprocess.CalledProcessError:
-            self._create_simple_video(image_path, output_path, duration)
-    
-    def _create_simple_video(self, image_path: str, output_path: str, duration: int):
-        """Create simple static video from image"""
-        
-        subprocess.run([
-            'ffmpeg',
-            '-loop', '1',
-            '-i', image_path,
-            '-t', str(duration),
+        A clip source is either an image path or an in-memory PIL image; the
+        latter are streamed to FFmpeg as raw RGB frames over stdin.
+        """
+        
+        # Each still is decoded once; no intermediate clips are encoded or written
+        cmd = ['ffmpeg']
+        filters = []
+        frames = []
+        input_count = 0
+        for index, (animation_type, source, duration) in enumerate(clip_jobs):
+            if isinstance(source, Image.Image):
+                source_pad = f"raw{len(frames)}"
+                frames.append(source)
+            else:
+                # Inputs are known single stills, so skip format probing and stream analysis
+                cmd += [
+                    '-f', 'image2', '-pattern_type', 'none',
+                    '-probesize', '32', '-analyzeduration', '0',
+                    '-framerate', str(self.config.fps),
+                    '-i', source,
+                ]
+                source_pad = f"{input_count}:v"
+                input_count += 1
+            filters.append(self._clip_filter(animation_type, source_pad, index, duration))
+        
+        if frames:
+            # Raw frames carry no header, so every still must already be the output size
+            size = (self.config.width, self.config.height)
+            frames = [frame if frame.size == size else frame.resize(size) for frame in frames]
+            
+            # All in-memory stills share one rawvideo input; split it back into single frames
+            cmd += [
+                '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                '-s', f"{self.config.width}x{self.config.height}",
+                '-framerate', str(self.config.fps),
+                '-i', 'pipe:0',
+            ]
+            split_pads = ''.join(f"[rawsrc{n}]" for n in range(len(frames)))
+            unpack = [f"[{input_count}:v]split={len(frames)}{split_pads}"] + [
+                f"[rawsrc{n}]trim=start_frame={n}:end_frame={n + 1},setpts=PTS-STARTPTS[raw{n}]"
+                for n in range(len(frames))
+            ]
+            filters = unpack + filters
+            input_count += 1
+        
+        labels = ''.join(f"[v{index}]" for index in range(len(clip_jobs)))
+        filters.append(f"{labels}concat=n={len(clip_jobs)}:v=1:a=0[v]")
+        
+        has_audio = os.path.exists(audio_path)
+        if has_audio:
+            cmd += ['-i', audio_path]
+        
+        cmd += ['-filter_complex', ';'.join(filters), '-map', '[v]']
+        
+        if has_audio:
+            cmd += [
+                '-map', f"{input_count}:a",
+                '-c:a', 'aac',
+                '-shortest',  # Match shortest duration
+            ]
+        
+        cmd += [
             '-r', str(self.config.fps),
+            *self._ffmpeg_encode_args(),
             '-pix_fmt', 'yuv420p',
+            # Put the moov atom up front so playback can start before the download finishes
+            '-movflags', '+faststart',
             '-y', output_path
-        ], check=True, capture_output=True)
+        ]
+        
+        raw_input = b''.join(frame.tobytes() for frame in frames) if frames else None
+        subprocess.run(cmd, input=raw_input, check=True, capture_output=True)
+        
+        return output_path
     
-    def _create_intro(self, script: Dict) -> str:
-        """Create intro sequence"""
+    def _create_intro(self, script: Dict) -> Image.Image:
+        """Create intro card image"""
         
         # Create intro image
         img = Image.new('RGB', (self.config.width, self.config.height), color='white')
@@ -161,12 +280,8 @@ class VideoComposer:
         title = script.get('title', 'Video')
         hook = script.get('hook', '')
         
-        try:
-            title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 80)
-            hook_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 50)
-        except:
-            title_font = ImageFont.load_default()
-            hook_font = ImageFont.load_default()
+        title_font = _load_font("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 80)
+        hook_font = _load_font("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 50)
         
         # Draw title
         bbox = draw.textbbox((0, 0), title, font=title_font)
@@ -181,52 +296,44 @@ class VideoComposer:
         
         # Draw hook if exists
         if hook:
-            # Word wrap hook text
+            # Word wrap hook text, measuring each word (plus its space) once
             words = hook.split()
+            widths = [hook_font.getlength(word + ' ') for word in words]
+            max_width = self.config.width - 200
             lines = []
             current_line = []
-            for word in words:
-                current_line.append(word)
-                test_line = ' '.join(current_line)
-                bbox = draw.textbbox((0, 0), test_line, font=hook_font)
-                if bbox[2] - bbox[0] > self.config.width - 200:
-                    current_line.pop()
+            line_width = 0
+            for word, width in zip(words, widths):
+                if current_line and line_width + width > max_width:
                     lines.append(' '.join(current_line))
+                    if len(lines) == 3:  # Only 3 lines are drawn; stop wrapping there
+                        current_line = []
+                        break
                     current_line = [word]
+                    line_width = width
+                else:
+                    current_line.append(word)
+                    line_width += width
             if current_line:
                 lines.append(' '.join(current_line))
             
-            # Draw hook lines
+            # Draw hook lines, centred by the middle anchor rather than a bbox per line
             y_offset = y + text_height + 100
             for line in lines[:3]:  # Max 3 lines
-                bbox = draw.textbbox((0, 0), line, font=hook_font)
-                line_width = bbox[2] - bbox[0]
-                x_pos = (self.config.width - line_width) // 2
-                draw.text((x_pos, y_offset), line, fill='black', font=hook_font)
+                draw.text((self.config.width // 2, y_offset), line, fill='black',
+                          font=hook_font, anchor='ma')
                 y_offset += 70
         
-        # Save intro image
-        intro_img_path = os.path.join(self.temp_dir, "intro.png")
-        img.save(intro_img_path)
-        
-        # Create video from intro image
-        intro_video_path = os.path.join(self.temp_dir, "intro.mp4")
-        self._create_fade_animation(intro_img_path, intro_video_path, 3)
-        
-        return intro_video_path
+        return img
     
-    def _create_outro(self, script: Dict, citations: List[Dict]) -> str:
-        """Create outro with citations"""
+    def _create_outro(self, script: Dict, citations: List[Dict]) -> Image.Image:
+        """Create outro card image with citations"""
         
         img = Image.new('RGB', (self.config.width, self.config.height), color='white')
         draw = ImageDraw.Draw(img)
         
-        try:
-            title_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 60)
-            text_font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 40)
-        except:
-            title_font = ImageFont.load_default()
-            text_font = ImageFont.load_default()
+        title_font = _load_font("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 60)
+        text_font = _load_font("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", 40)
         
         # "Thanks for watching"
         thanks_text = "Thanks for watching!"
@@ -256,56 +363,4 @@ class VideoComposer:
                 y = 900
                 draw.text((x, y), author_text, fill='gray', font=text_font)
         
-        # Save outro image
-        outro_img_path = os.path.join(self.temp_dir, "outro.png")
-        img.save(outro_img_path)
-        
-        # Create video
-        outro_video_path = os.path.join(self.temp_dir, "outro.mp4")
-        self._create_simple_video(outro_img_path, outro_video_path, 3)
-        
-        return outro_video_path
-    
-    def _concatenate_videos(self, video_paths: List[str]) -> str:
-        """Concatenate multiple videos into one"""
-        
-        # Create concat file for FFmpeg
-        concat_file = os.path.join(self.temp_dir, "concat_list.txt")
-        with open(concat_file, 'w') as f:
-            for video_path in video_paths:
-                if os.path.exists(video_path):
-                    f.write(f"file '{os.path.abspath(video_path)}'\n")
-        
-        # Concatenate using FFmpeg
-        output_path = os.path.join(self.temp_dir, "concatenated.mp4")
-        subprocess.run([
-            'ffmpeg',
-            '-f', 'concat',
-            '-safe', '0',
-            '-i', concat_file,
-            '-c', 'copy',
-            '-y', output_path
-        ], check=True, capture_output=True)
-        
-        return output_path
-    
-    def _add_audio(self, video_path: str, audio_path: str, output_path: str) -> str:
-        """Add audio track to video"""
-        
-        if not os.path.exists(audio_path):
-            # No audio, just copy video
-            subprocess.run(['cp', video_path, output_path], check=True)
-            return output_path
-        
-        # Merge video and audio
-        subprocess.run([
-            'ffmpeg',
-            '-i', video_path,
-            '-i', audio_path,
-            '-c:v', 'copy',
-            '-c:a', 'aac',
-            '-shortest',  # Match shortest duration
-            '-y', output_path
-        ], check=True, capture_output=True)
-        
-        return output_path
\ No newline at end of file
+        return img
\ No newline at end of file
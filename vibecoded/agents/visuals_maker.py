@@ -3,7 +3,10 @@ agents/visuals_maker.py
 Generates doodle-style visuals using Stable Diffusion and image processing
 """
 
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from PIL import Image, ImageDraw, ImageFont, ImageFilter
 import numpy as np
 from typing import Dict, List, Tuple
@@ -11,6 +14,33 @@ import random
 import requests
 import io
 
+try:
+    from numba import njit
+except ImportError:  # optional: the geometry kernels then run as plain NumPy
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+@lru_cache(maxsize=32)
+def _load_font(path: str, size: int):
+    """Load a TrueType font once per (path, size); falls back to Pillow's default font"""
+    try:
+        return ImageFont.truetype(path, size)
+    except (OSError, ImportError):
+        return ImageFont.load_default()
+
+
+@njit(cache=True)
+def _polar_points(cx, cy, r, theta):
+    """(N, 2) points at radius r and angle theta (radians) around (cx, cy)"""
+    return np.column_stack((cx + r * np.cos(theta), cy + r * np.sin(theta)))
+
+
+@njit(cache=True)
+def _line_points(x1, y1, x2, y2, t):
+    """(N, 2) points at fractions t along the line from (x1, y1) to (x2, y2)"""
+    return np.column_stack((x1 + (x2 - x1) * t, y1 + (y2 - y1) * t))
+
 
 class VisualsMaker:
     """Creates doodle-style visuals for video scenes"""
@@ -28,6 +58,13 @@ class VisualsMaker:
         self.output_dir = "temp_processing/visuals"
         os.makedirs(self.output_dir, exist_ok=True)
         
+        # Vectorised random source for noise and texture
+        self.rng = np.random.default_rng()
+        
+        # One canvas and draw context, wiped between scenes instead of reallocated
+        self._canvas = Image.new('RGB', (self.width, self.height), color='white')
+        self._draw = ImageDraw.Draw(self._canvas)
+        
         # Style presets
         self.style_prompts = {
             'doodle': 'simple line art doodle, hand-drawn sketch, minimalist illustration, black and white, clean lines',
@@ -35,70 +72,81 @@ class VisualsMaker:
             'sketch': 'pencil sketch, hand-drawn illustration, artistic drawing, sketch style'
         }
     
-    def generate_visuals(self, script: Dict) -> Dict:
+    def generate_visuals(self, script: Dict, style: str = None) -> Dict:
         """
         Generate visual assets for each scene in the script
         
         Args:
             script: Script dictionary with scenes
+            style: Visual style for this call (defaults to the instance style)
             
         Returns:
-            Dictionary mapping scene numbers to visual asset paths
+            Dictionary mapping scene numbers to in-memory scene images
         """
         visual_assets = {}
         
         scenes = script.get('scenes', [])
         print(f"Generating visuals for {len(scenes)} scenes...")
         
-        for scene in scenes:
-            scene_num = scene.get('scene_number', 0)
+        if not scenes:
+            return visual_assets
+        
+        for scene_num, image, duration, animation_type in self._render_scenes(
+                scenes, style or self.style):
             print(f"  - Scene {scene_num}...")
             
-            # Generate visual for this scene
-            visual_path = self._generate_scene_visual(scene, scene_num)
-            
             visual_assets[scene_num] = {
-                'path': visual_path,
-                'duration': scene.get('duration', 10),
-                'animation_type': scene.get('animation_type', 'draw_on')
+                'image': image,
+                'duration': duration,
+                'animation_type': animation_type
             }
         
         return visual_assets
     
-    def _generate_scene_visual(self, scene: Dict, scene_num: int) -> str:
+    def _render_scenes(self, scenes: List[Dict], style: str):
+        """Yield (scene_num, image, duration, animation_type) for each scene, in order"""
+        workers = min(len(scenes), os.cpu_count() or 1)
+        if workers == 1:
+            # A lone worker process would only add start-up and image pickling; draw here
+            renderer = self if style == self.style else VisualsMaker(style)
+            for scene in scenes:
+                yield _render_scene(renderer, scene)
+            return
+        
+        # Scenes are independent and CPU-bound, so render them in separate processes.
+        # Not forked: callers draw visuals while other threads (narration) are running
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_scene_pool_context(),
+                                 initializer=_init_scene_worker,
+                                 initargs=(style,)) as executor:
+            yield from executor.map(_generate_scene_visual_task, scenes)
+    
+    def _generate_scene_visual(self, scene: Dict, scene_num: int) -> Image.Image:
         """Generate visual for a single scene"""
         
         visual_desc = scene.get('visual_description', '')
         visual_elements = scene.get('visual_elements', [])
         
-        # Create canvas
-        img = Image.new('RGB', (self.width, self.height), color='white')
-        draw = ImageDraw.Draw(img)
+        # Reset the shared canvas
+        self._draw.rectangle([(0, 0), (self.width, self.height)], fill='white')
         
         # Method 1: Use local generation (fast, always works)
-        self._draw_doodle_style(draw, visual_desc, visual_elements)
+        self._draw_doodle_style(self._draw, visual_desc, visual_elements)
         
         # Method 2: Alternative - call Stable Diffusion API if available
         # Uncomment and configure if you have SD API access:
         # img = self._generate_with_stable_diffusion(visual_desc)
         
-        # Add sketch/doodle effects
-        img = self._apply_style_effects(img)
-        
-        # Save
-        output_path = os.path.join(self.output_dir, f"scene_{scene_num:02d}.png")
-        img.save(output_path, quality=95)
-        
-        return output_path
+        # Add sketch/doodle effects (returns a new image; the canvas is left for reuse)
+        # Handed to the composer in memory: no PNG encode here and no decode in FFmpeg
+        return self._apply_style_effects(self._canvas)
     
     def _draw_doodle_style(self, draw: ImageDraw.Draw, description: str, elements: List[str]):
         """Draw simple doodle-style illustrations directly"""
         
-        # Background - subtle texture
-        for _ in range(100):
-            x = random.randint(0, self.width)
-            y = random.randint(0, self.height)
-            draw.point((x, y), fill=(240, 240, 240))
+        # Background - subtle texture, all specks drawn in one call
+        xs = self.rng.integers(0, self.width, 100, endpoint=True)
+        ys = self.rng.integers(0, self.height, 100, endpoint=True)
+        draw.point(np.column_stack((xs, ys)).ravel().tolist(), fill=(240, 240, 240))
         
         # Draw elements based on keywords
         center_x = self.width // 2
@@ -124,10 +172,7 @@ class VisualsMaker:
                 self._draw_star(draw, x, y, 40)
         
         # Draw text labels for key elements
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 50)
-        except:
-            font = ImageFont.load_default()
+        font = _load_font("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", 50)
         
         for i, element in enumerate(elements[:3]):
             y_pos = 200 + (i * 150)
@@ -136,32 +181,26 @@ class VisualsMaker:
     
     def _draw_wobbly_circle(self, draw: ImageDraw.Draw, cx: int, cy: int, radius: int):
         """Draw a hand-drawn style circle"""
-        points = []
-        for angle in range(0, 360, 5):
-            rad = np.radians(angle)
-            wobble = random.randint(-10, 10)
-            r = radius + wobble
-            x = cx + r * np.cos(rad)
-            y = cy + r * np.sin(rad)
-            points.append((x, y))
-        
-        # Draw with multiple overlapping lines for sketchy effect
-        for _ in range(3):
-            offset_points = [(x + random.randint(-2, 2), y + random.randint(-2, 2)) for x, y in points]
-            draw.line(offset_points + [offset_points[0]], fill='black', width=3)
+        rad = np.radians(np.arange(0, 360, 5))
+        r = radius + self.rng.integers(-10, 10, rad.size, endpoint=True)
+        points = _polar_points(cx, cy, r, rad)
+        
+        # Draw with multiple overlapping lines for sketchy effect; all three
+        # jittered rings are built and closed in one batch
+        rings = points + self.rng.integers(-2, 2, (3, *points.shape), endpoint=True)
+        rings = np.concatenate((rings, rings[:, :1]), axis=1)
+        for ring in rings:
+            draw.line(ring.ravel().tolist(), fill='black', width=3)
     
     def _draw_hand_drawn_arrow(self, draw: ImageDraw.Draw, x1: int, y1: int, x2: int, y2: int):
         """Draw a sketchy arrow"""
         # Main line with wobble
         segments = 20
-        points = []
-        for i in range(segments + 1):
-            t = i / segments
-            x = x1 + (x2 - x1) * t + random.randint(-5, 5)
-            y = y1 + (y2 - y1) * t + random.randint(-5, 5)
-            points.append((x, y))
+        t = np.linspace(0, 1, segments + 1)
+        points = _line_points(x1, y1, x2, y2, t)
+        points += self.rng.integers(-5, 5, points.shape, endpoint=True)
         
-        draw.line(points, fill='black', width=4)
+        draw.line(points.ravel().tolist(), fill='black', width=4)
         
         # Arrowhead
         angle = np.arctan2(y2 - y1, x2 - x1)
@@ -189,41 +228,38 @@ class VisualsMaker:
     def _draw_brain_doodle(self, draw: ImageDraw.Draw, cx: int, cy: int):
         """Draw a simplified brain doodle"""
         # Simplified brain outline with curves
-        points = []
-        for angle in range(0, 180, 10):
-            rad = np.radians(angle)
-            r = 150 + 30 * np.sin(rad * 3)
-            x = cx + r * np.cos(rad)
-            y = cy + r * np.sin(rad)
-            points.append((x, y))
+        rad = np.radians(np.arange(0, 180, 10))
+        r = 150 + 30 * np.sin(rad * 3)
+        points = _polar_points(cx, cy, r, rad)
         
-        draw.line(points, fill='black', width=4)
+        draw.line(points.ravel().tolist(), fill='black', width=4)
         
-        # Add squiggles inside
+        # Add squiggles inside (same wave shape, shifted along x)
+        j = np.arange(10)
+        wave = np.column_stack((j * 10, cy - 50 + 20 * np.sin(j * 0.5)))
         for i in range(5):
-            start_x = cx - 100 + i * 40
-            y = cy - 50
-            squiggle = [(start_x + j * 10, y + 20 * np.sin(j * 0.5)) for j in range(10)]
-            draw.line(squiggle, fill='black', width=3)
+            squiggle = wave + (cx - 100 + i * 40, 0)
+            draw.line(squiggle.ravel().tolist(), fill='black', width=3)
     
     def _draw_star(self, draw: ImageDraw.Draw, cx: int, cy: int, size: int):
         """Draw a hand-drawn star"""
-        points = []
-        for i in range(10):
-            angle = np.radians(i * 36)
-            r = size if i % 2 == 0 else size // 2
-            x = cx + r * np.cos(angle - np.pi / 2)
-            y = cy + r * np.sin(angle - np.pi / 2)
-            points.append((x, y))
-        
-        draw.polygon(points, outline='black', fill=None, width=3)
+        angle = np.radians(np.arange(10) * 36) - np.pi / 2
+        r = np.where(np.arange(10) % 2 == 0, size, size // 2)
+        points = _polar_points(cx, cy, r, angle)
+        
+        draw.polygon(points.ravel().tolist(), outline='black', fill=None, width=3)
     
     def _draw_sketchy_text(self, draw: ImageDraw.Draw, text: str, x: int, y: int, font):
         """Draw text with sketchy effect"""
-        # Draw text multiple times with slight offset for hand-drawn look
+        # Rasterize the glyphs once into a mask centred on (0, 0), then stamp it
+        left, top, right, bottom = font.getbbox(text, anchor="mm")
+        mask = Image.new('L', (right - left, bottom - top))
+        ImageDraw.Draw(mask).text((-left, -top), text, fill=255, font=font, anchor="mm")
+        
+        # Stamp the text multiple times with slight offset for hand-drawn look
         for dx, dy in [(-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1)]:
-            draw.text((x + dx, y + dy), text, fill=(200, 200, 200), font=font, anchor="mm")
-        draw.text((x, y), text, fill='black', font=font, anchor="mm")
+            draw.bitmap((x + dx + left, y + dy + top), mask, fill=(200, 200, 200))
+        draw.bitmap((x + left, y + top), mask, fill='black')
     
     def _apply_style_effects(self, img: Image.Image) -> Image.Image:
         """Apply style-specific effects to the image"""
@@ -237,11 +273,12 @@ class VisualsMaker:
             # Slightly blur for marker effect
             img = img.filter(ImageFilter.GaussianBlur(radius=1))
         
-        # Add slight noise for hand-drawn feel
-        arr = np.array(img)
-        noise = np.random.randint(-10, 10, arr.shape, dtype=np.int16)
-        arr = np.clip(arr.astype(np.int16) + noise, 0, 255).astype(np.uint8)
-        img = Image.fromarray(arr)
+        # Add slight noise for hand-drawn feel, accumulating in place in the noise buffer
+        arr = np.asarray(img)
+        noise = self.rng.integers(-10, 10, arr.shape, dtype=np.int16)
+        noise += arr
+        np.clip(noise, 0, 255, out=noise)
+        img = Image.fromarray(noise.astype(np.uint8))
         
         return img
     
@@ -270,4 +307,36 @@ class VisualsMaker:
         # img = Image.open(io.BytesIO(base64.b64decode(img_data)))
         
         # Fallback: return empty canvas
-        return Image.new('RGB', (self.width, self.height), color='white')
\ No newline at end of file
+        return Image.new('RGB', (self.width, self.height), color='white')
+
+
+# Per-process renderer for generate_visuals; module level so it pickles under spawn
+_scene_worker = None
+
+
+def _scene_pool_context():
+    """Start method for the scene pool: a fork server where available, else spawn"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # Import this module once in the server, so workers fork with it loaded
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _init_scene_worker(style: str):
+    """Give each worker process its own VisualsMaker (and so its own canvas and RNG)"""
+    global _scene_worker
+    _scene_worker = VisualsMaker(style)
+
+
+def _render_scene(maker: VisualsMaker, scene: Dict) -> Tuple[int, Image.Image, int, str]:
+    """Render one scene; returns (scene_num, image, duration, animation_type)"""
+    scene_num = scene.get('scene_number', 0)
+    image = maker._generate_scene_visual(scene, scene_num)
+    return scene_num, image, scene.get('duration', 10), scene.get('animation_type', 'draw_on')
+
+
+def _generate_scene_visual_task(scene: Dict) -> Tuple[int, Image.Image, int, str]:
+    """Render one scene in a pool worker with that process's VisualsMaker"""
+    return _render_scene(_scene_worker, scene)
\ No newline at end of file
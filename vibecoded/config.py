@@ -3,9 +3,14 @@ config.py - Configuration settings for the application
 """
 
 import os
+import re
 from dataclasses import dataclass, field
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Pattern, Tuple
 
+# Whitespace as Python's `re` reads `\s`; Hyperscan's Unicode `\s` leaves out
+# the \x1c-\x1f separators, so they are listed explicitly for both engines
+_WS = r'[\s\x1c-\x1f]'
 
 @dataclass
 class AppConfig:
@@ -107,15 +112,15 @@ class SecurityConfig:
     enable_sanitization: bool = True
     max_input_length: int = 50000
     
-    # Malicious patterns to detect
+    # Malicious patterns to detect (the converter's sanitizer strips these)
     blocked_patterns: List[str] = field(default_factory=lambda: [
-        r'ignore\s+(previous|all|above)\s+instructions',
-        r'disregard\s+.{0,20}instructions',
-        r'system\s*[:]\s*you\s+are',
-        r'<\s*script\s*>',
-        r'javascript\s*:',
-        r'eval\s*\(',
-        r'exec\s*\(',
+        rf'ignore{_WS}+(previous|all|above){_WS}+instructions',
+        rf'disregard{_WS}+.{{0,20}}instructions',
+        rf'system{_WS}*[:]{_WS}*you{_WS}+are',
+        rf'<{_WS}*script{_WS}*>',
+        rf'javascript{_WS}*:',
+        rf'eval{_WS}*\(',
+        rf'exec{_WS}*\(',
         r'__import__',
         r'subprocess',
         r'os\.system',
@@ -124,6 +129,16 @@ class SecurityConfig:
     # Rate limiting
     enable_rate_limit: bool = False
     max_requests_per_hour: int = 10
+    
+    def compile_blocked(self) -> Pattern:
+        """All blocked_patterns as one case-insensitive regex, so text is scanned once"""
+        return _compile_pattern_union(tuple(self.blocked_patterns))
+
+
+@lru_cache(maxsize=8)
+def _compile_pattern_union(patterns: Tuple[str, ...]) -> Pattern:
+    """Compile patterns into a single alternation (cached per pattern set)"""
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
 
 
 # Preset configurations for different use cases
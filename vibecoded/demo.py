@@ -3,9 +3,18 @@ demo.py - Demonstration script showing various usage examples
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from functools import lru_cache
 from main import PDFtoShortsConverter, VideoConfig
 
 
+@lru_cache(maxsize=1)
+def _get_api_key() -> str:
+    """Gemini API key from the environment, prompted for at most once per run"""
+    return os.environ.get('GEMINI_API_KEY') or input("Enter your Gemini API key: ")
+
+
 def demo_basic():
     """Basic usage example"""
     print("=" * 60)
@@ -13,7 +22,7 @@ def demo_basic():
     print("=" * 60)
     
     # Get API key from environment or input
-    api_key = os.environ.get('GEMINI_API_KEY') or input("Enter your Gemini API key: ")
+    api_key = _get_api_key()
     
     # Create converter with default settings
     converter = PDFtoShortsConverter(gemini_api_key=api_key)
@@ -31,7 +40,7 @@ def demo_custom_config():
     print("DEMO 2: Custom Configuration")
     print("=" * 60)
     
-    api_key = os.environ.get('GEMINI_API_KEY') or input("Enter your Gemini API key: ")
+    api_key = _get_api_key()
     
     # Custom configuration
     config = VideoConfig(
@@ -55,38 +64,70 @@ def demo_custom_config():
     print(f"\n✅ Custom video created: {output_path}")
 
 
-def demo_batch_processing():
-    """Process multiple PDFs"""
+def demo_batch_processing(pdf_dir: str = "."):
+    """Process every PDF in a directory"""
     print("=" * 60)
     print("DEMO 3: Batch Processing")
     print("=" * 60)
     
-    api_key = os.environ.get('GEMINI_API_KEY') or input("Enter your Gemini API key: ")
+    api_key = _get_api_key()
     
-    # List of PDFs to process
-    pdf_files = [
-        "document1.pdf",
-        "document2.pdf",
-        "document3.pdf"
-    ]
+    # One directory pass lists the PDFs with their sizes; schedule the largest
+    # first so the longest jobs don't start last and stretch the batch
+    with os.scandir(pdf_dir) as entries:
+        pdf_entries = [
+            entry for entry in entries
+            if entry.is_file() and entry.name.lower().endswith('.pdf')
+        ]
+    pdf_entries.sort(key=lambda entry: entry.stat().st_size, reverse=True)
     
-    converter = PDFtoShortsConverter(gemini_api_key=api_key)
+    jobs = list(enumerate((entry.path for entry in pdf_entries), 1))
+    if not jobs:
+        print(f"⚠️  No PDFs found in {pdf_dir}")
     
+    converter = PDFtoShortsConverter(gemini_api_key=api_key)
+    config_kwargs = asdict(converter.config)
     results = []
-    for i, pdf_path in enumerate(pdf_files, 1):
-        if not os.path.exists(pdf_path):
-            print(f"⚠️  Skipping {pdf_path} (not found)")
-            continue
-        
-        print(f"\n📄 Processing {i}/{len(pdf_files)}: {pdf_path}")
-        
-        output_name = f"short_{i:02d}.mp4"
-        try:
-            output_path = converter.process_pdf(pdf_path, output_name)
-            results.append({'pdf': pdf_path, 'video': output_path, 'status': 'success'})
-        except Exception as e:
-            print(f"❌ Error processing {pdf_path}: {e}")
-            results.append({'pdf': pdf_path, 'video': None, 'status': 'failed'})
+    
+    # Script generation is a network-bound Gemini round-trip: issue all requests at once
+    prepared = []
+    if jobs:
+        with ThreadPoolExecutor(max_workers=min(len(jobs), 8)) as executor:
+            futures = {
+                executor.submit(converter._extract_and_script, pdf_path): (i, pdf_path)
+                for i, pdf_path in jobs
+            }
+            for future in as_completed(futures):
+                i, pdf_path = futures[future]
+                try:
+                    prepared.append((i, pdf_path, *future.result()))
+                except Exception as e:
+                    print(f"❌ Error processing {pdf_path}: {e}")
+                    results.append((i, {'pdf': pdf_path, 'video': None, 'status': 'failed'}))
+    
+    # Rendering is CPU-bound and independent per PDF, so use one process per PDF
+    if prepared:
+        with ProcessPoolExecutor(max_workers=min(len(prepared), os.cpu_count() or 1)) as executor:
+            futures = {}
+            for i, pdf_path, extracted_data, script in prepared:
+                print(f"\n📄 Processing {i}/{len(jobs)}: {pdf_path}")
+                # Absolute paths, resolved here: worker processes are reused across jobs
+                future = executor.submit(
+                    _batch_worker, extracted_data, script,
+                    os.path.abspath(f"short_{i:02d}.mp4"), api_key, config_kwargs,
+                    os.path.abspath(os.path.join("temp_processing", f"batch_{i:02d}"))
+                )
+                futures[future] = (i, pdf_path)
+            
+            for future in as_completed(futures):
+                i, pdf_path = futures[future]
+                try:
+                    output_path = future.result()
+                    results.append((i, {'pdf': pdf_path, 'video': output_path, 'status': 'success'}))
+                except Exception as e:
+                    print(f"❌ Error processing {pdf_path}: {e}")
+                    results.append((i, {'pdf': pdf_path, 'video': None, 'status': 'failed'}))
+    results = [result for _, result in sorted(results, key=lambda item: item[0])]
     
     # Summary
     print("\n" + "=" * 60)
@@ -97,13 +138,37 @@ def demo_batch_processing():
         print(f"{status_icon} {result['pdf']} -> {result['video']}")
 
 
+def _batch_worker(extracted_data: dict, script: dict, output_path: str, api_key: str,
+                  config_kwargs: dict, work_dir: str) -> str:
+    """
+    Render one scripted PDF in a batch worker process
+    
+    Module level so it pickles. The agents write to fixed paths under the
+    working directory, so each job runs in its own directory to keep
+    concurrent jobs from overwriting each other's intermediates. Both paths
+    must be absolute; the previous working directory is restored afterwards
+    because the pool hands this process further jobs.
+    """
+    os.makedirs(work_dir, exist_ok=True)
+    previous_dir = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        converter = PDFtoShortsConverter(
+            gemini_api_key=api_key,
+            config=VideoConfig(**config_kwargs)
+        )
+        return converter._produce_video(extracted_data, script, output_path)
+    finally:
+        os.chdir(previous_dir)
+
+
 def demo_step_by_step():
     """Show step-by-step processing for educational purposes"""
     print("=" * 60)
     print("DEMO 4: Step-by-Step Processing")
     print("=" * 60)
     
-    api_key = os.environ.get('GEMINI_API_KEY') or input("Enter your Gemini API key: ")
+    api_key = _get_api_key()
     
     pdf_path = "example.pdf"
     
@@ -124,19 +189,30 @@ def demo_step_by_step():
     print(f"   - Generated {len(script['scenes'])} scenes")
     print(f"   - Hook: {script.get('hook', 'N/A')[:80]}...")
     
-    # Step 3: Create visuals
-    print("\n🎨 Step 3: Creating visuals...")
+    # Steps 3 and 4 only need the script, so they run side by side
     from agents.visuals_maker import VisualsMaker
+    from agents.narrator import Narrator
     visuals_maker = VisualsMaker(style='doodle')
-    visual_assets = visuals_maker.generate_visuals(script)
-    print(f"   - Created {len(visual_assets)} visual assets")
+    narrator = Narrator()
     
-    # Step 4: Generate narration
+    print("\n🎨 Step 3: Creating visuals...")
     print("\n🎙️  Step 4: Generating narration...")
-    from agents.narrator import Narrator
-    narrator = Narrator()
-    audio_path = narrator.generate_audio(script)
-    print(f"   - Audio saved to: {audio_path}")
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        visuals_future = executor.submit(visuals_maker.generate_visuals, script)
+        audio_future = executor.submit(narrator.generate_audio, script)
+        
+        # Report each step as soon as it finishes
+        def report_visuals(future):
+            if future.exception() is None:
+                print(f"   - Created {len(future.result())} visual assets")
+        
+        def report_audio(future):
+            if future.exception() is None:
+                print(f"   - Audio saved to: {future.result()}")
+        
+        visuals_future.add_done_callback(report_visuals)
+        audio_future.add_done_callback(report_audio)
+        visual_assets, audio_path = visuals_future.result(), audio_future.result()
     
     # Step 5: Compose video
     print("\n🎬 Step 5: Composing final video...")
@@ -199,11 +275,11 @@ def demo_test_components():
             'visual_elements': ['circle', 'arrow'],
             'animation_type': 'draw_on'
         }
-        visual_path = visuals_maker._generate_scene_visual(test_scene, 1)
-        if os.path.exists(visual_path):
-            print(f"   ✅ Test visual created: {visual_path}")
+        visual = visuals_maker._generate_scene_visual(test_scene, 1)
+        if visual.size == (visuals_maker.width, visuals_maker.height):
+            print(f"   ✅ Test visual created: {visual.size[0]}x{visual.size[1]}")
         else:
-            print("   ⚠️  Visual file not found")
+            print(f"   ⚠️  Unexpected visual size: {visual.size}")
     except Exception as e:
         print(f"   ❌ Error: {e}")
     
@@ -236,28 +312,33 @@ def demo_different_styles():
     print("DEMO 6: Visual Style Comparison")
     print("=" * 60)
     
-    api_key = os.environ.get('GEMINI_API_KEY') or input("Enter your Gemini API key: ")
+    api_key = _get_api_key()
     
     pdf_path = "example.pdf"
     styles = ['doodle', 'whiteboard', 'sketch']
     
+    config = VideoConfig(duration=30)  # Shorter for comparison
+    converter = PDFtoShortsConverter(
+        gemini_api_key=api_key,
+        config=config
+    )
+    
+    # Extraction, script and narration don't depend on the style: produce them once
+    try:
+        extracted_data, script = converter._extract_and_script(pdf_path)
+        audio_path = converter._narrate(script)
+    except Exception as e:
+        print(f"   ❌ Error: {e}")
+        return
+    
     for style in styles:
         print(f"\n🎨 Creating {style} style video...")
         
-        config = VideoConfig(
-            duration=30,  # Shorter for comparison
-            style=style
-        )
-        
-        converter = PDFtoShortsConverter(
-            gemini_api_key=api_key,
-            config=config
-        )
-        
         output_path = f"output_{style}.mp4"
         
         try:
-            converter.process_pdf(pdf_path, output_path)
+            converter._render(script, audio_path, style, output_path,
+                              extracted_data.get('citations', []))
             print(f"   ✅ {style} video created: {output_path}")
         except Exception as e:
             print(f"   ❌ Error: {e}")
@@ -5,10 +5,57 @@ Main application file that orchestrates the entire pipeline
 
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import Dict, List, Tuple
 from dataclasses import dataclass
 import json
 
+from config import DEFAULT_SECURITY_CONFIG
+from utils import SimpleCache, get_file_hash, prune_directory
+
+try:
+    from agents.content_extractor import ContentExtractor
+    from agents.script_writer import ScriptWriter
+    from agents.visuals_maker import VisualsMaker
+    from agents.narrator import Narrator
+    from agents.video_composer import VideoComposer
+except ImportError as e:  # agent dependencies missing: VideoConfig and the sanitizer still work
+    _AGENTS_IMPORT_ERROR = e
+else:
+    _AGENTS_IMPORT_ERROR = None
+
+try:
+    import hyperscan
+except ImportError:  # optional: the sanitizer falls back to the `re` alternation
+    hyperscan = None
+
+# Prompt-injection and code patterns stripped from extracted text (one list, in config)
+_MALICIOUS_PATTERNS = tuple(DEFAULT_SECURITY_CONFIG.blocked_patterns)
+
+# Part of every stage cache key: bump when the extractor output, script prompt
+# or script format changes so older entries stop being served
+CACHE_VERSION = 1
+# Cached stage outputs are recomputed after a week
+CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+
+@lru_cache(maxsize=1)
+def _hyperscan_db():
+    """Compile the malicious patterns into one Hyperscan database (None without hyperscan)"""
+    if hyperscan is None:
+        return None
+    # UTF8 + UCP give `\s`, `.` and caseless matching the same Unicode meaning as `re`
+    flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_UTF8
+             | hyperscan.HS_FLAG_UCP | hyperscan.HS_FLAG_SINGLEMATCH)
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[p.encode() for p in _MALICIOUS_PATTERNS],
+        ids=list(range(len(_MALICIOUS_PATTERNS))),
+        flags=[flags] * len(_MALICIOUS_PATTERNS),
+    )
+    return db
+
 @dataclass
 class VideoConfig:
     """Configuration for video generation"""
@@ -17,17 +64,43 @@ class VideoConfig:
     height: int = 1920  # 9:16 aspect ratio for Shorts
     fps: int = 30
     style: str = "doodle"  # doodle, whiteboard, sketch
+    video_codec: str = "libx264"
+    video_preset: str = "veryfast"  # ultrafast, veryfast, fast, medium, slow
+    crf: int = 23  # 0-51, lower = better quality
 
 
 class PDFtoShortsConverter:
     """Main orchestrator for PDF to YouTube Shorts conversion"""
     
+    # Patterns to detect and remove, compiled once into a single alternation
+    _MALICIOUS_RE = DEFAULT_SECURITY_CONFIG.compile_blocked()
+    _MULTI_NL_RE = re.compile(r'\n{3,}')
+    _MULTI_SP_RE = re.compile(r' {2,}')
+    
+    # Narration audio files kept on disk
+    MAX_CACHED_ASSETS = 200
+    
     def __init__(self, gemini_api_key: str, config: VideoConfig = None):
         self.gemini_api_key = gemini_api_key
         self.config = config or VideoConfig()
         self.temp_dir = "temp_processing"
         os.makedirs(self.temp_dir, exist_ok=True)
         
+        # Stage outputs keyed by PDF content hash, so repeat conversions skip finished work
+        self._cache = SimpleCache(os.path.join(self.temp_dir, "cache"), max_age=CACHE_MAX_AGE)
+        
+        # Agents are built once and reused across process_pdf calls
+        if _AGENTS_IMPORT_ERROR is None:
+            self._extractor = ContentExtractor()
+            self._script_writer = ScriptWriter(self.gemini_api_key)
+            self._visuals_maker = VisualsMaker(style=self.config.style)
+            self._narrator = Narrator()
+            self._composer = VideoComposer(self.config)
+            
+            # Narration audio is content-addressed and reused across runs; keep
+            # only the most recently used files so the directory stays bounded
+            prune_directory(self._narrator.output_dir, self.MAX_CACHED_ASSETS)
+        
     def process_pdf(self, pdf_path: str, output_path: str = "output_short.mp4") -> str:
         """
         Main pipeline: PDF -> Text -> Script -> Visuals -> Video
@@ -39,48 +112,28 @@ class PDFtoShortsConverter:
         Returns:
             Path to generated video
         """
-        print("🚀 Starting PDF to YouTube Shorts conversion...")
-        
-        # Step 1: Extract content from PDF
-        print("\n📄 Step 1: Extracting content from PDF...")
-        from agents.content_extractor import ContentExtractor
-        extractor = ContentExtractor()
-        extracted_data = extractor.extract(pdf_path)
-        
-        # Step 2: Sanitize content (remove malicious content/prompt injections)
-        print("\n🛡️ Step 2: Sanitizing content...")
-        sanitized_text = self._sanitize_content(extracted_data['text'])
-        sanitized_data = {
-            **extracted_data,
-            'text': sanitized_text
-        }
+        if _AGENTS_IMPORT_ERROR is not None:
+            raise _AGENTS_IMPORT_ERROR
         
-        # Step 3: Generate script using Gemini
-        print("\n✍️ Step 3: Generating video script with Gemini...")
-        from agents.script_writer import ScriptWriter
-        script_writer = ScriptWriter(self.gemini_api_key)
-        script = script_writer.generate_script(
-            sanitized_data, 
-            max_duration=self.config.duration
-        )
-        
-        # Step 4: Generate visuals
+        print("🚀 Starting PDF to YouTube Shorts conversion...")
+        extracted_data, script = self._extract_and_script(pdf_path)
+        return self._produce_video(extracted_data, script, output_path)
+    
+    def _produce_video(self, extracted_data: Dict, script: Dict, output_path: str) -> str:
+        """Back half of the pipeline: visuals, narration and composition for a finished script"""
+        # Steps 4 and 5 only depend on the script, so produce them side by side
         print("\n🎨 Step 4: Creating doodle-style visuals...")
-        from agents.visuals_maker import VisualsMaker
-        visuals_maker = VisualsMaker(style=self.config.style)
-        visual_assets = visuals_maker.generate_visuals(script)
-        
-        # Step 5: Generate narration audio
         print("\n🎙️ Step 5: Generating narration...")
-        from agents.narrator import Narrator
-        narrator = Narrator()
-        audio_path = narrator.generate_audio(script)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            visuals_future = executor.submit(
+                self._visuals_maker.generate_visuals, script, self.config.style
+            )
+            audio_future = executor.submit(self._narrate, script)
+            visual_assets, audio_path = visuals_future.result(), audio_future.result()
         
         # Step 6: Compose final video
         print("\n🎬 Step 6: Composing final video...")
-        from agents.video_composer import VideoComposer
-        composer = VideoComposer(self.config)
-        final_video = composer.compose(
+        final_video = self._composer.compose(
             script=script,
             visual_assets=visual_assets,
             audio_path=audio_path,
@@ -91,6 +144,76 @@ class PDFtoShortsConverter:
         print(f"\n✅ Video generated successfully: {final_video}")
         return final_video
     
+    def _extract_and_script(self, pdf_path: str) -> Tuple[Dict, Dict]:
+        """
+        Style-independent front half of the pipeline: extract, sanitize, write script
+        
+        Returns:
+            Tuple of (extracted data, script)
+        """
+        # The filename is part of the key: it lands in the metadata and citations
+        pdf_key = f"v{CACHE_VERSION}-{get_file_hash(pdf_path)}-{os.path.basename(pdf_path)}"
+        
+        # Step 1: Extract content from PDF
+        print("\n📄 Step 1: Extracting content from PDF...")
+        extracted_data = self._cached(
+            f"{pdf_key}-extract", lambda: self._extractor.extract(pdf_path)
+        )
+        
+        # Step 2: Sanitize content (remove malicious content/prompt injections),
+        # in place so the raw and sanitized text aren't both held alongside a dict copy
+        print("\n🛡️ Step 2: Sanitizing content...")
+        extracted_data['text'] = self._sanitize_content(extracted_data['text'])
+        
+        # Step 3: Generate script using Gemini, warming up the later stages'
+        # one-time setup in the background while the request is in flight
+        print("\n✍️ Step 3: Generating video script with Gemini...")
+        with ThreadPoolExecutor(max_workers=1) as prewarm:
+            prewarm_future = prewarm.submit(self._prewarm)
+            script = self._cached(f"{pdf_key}-{self.config.duration}s-script", lambda: self._script_writer.generate_script(
+                extracted_data, 
+                max_duration=self.config.duration
+            ))
+        
+        # Joined before returning: the next stages fork worker processes, which
+        # must not happen while this thread may hold locks mid-probe
+        prewarm_error = prewarm_future.exception()
+        if prewarm_error is not None:
+            print(f"⚠️  Prewarm failed (the stages will set up on first use): {prewarm_error}")
+        
+        return extracted_data, script
+    
+    def _prewarm(self):
+        """Load the TTS voice and pick the encoder ahead of the stages that need them"""
+        self._narrator.prewarm()
+        self._composer.prewarm()
+    
+    def _render(self, script: Dict, audio_path: str, style: str,
+                output_path: str, citations: List[Dict]) -> str:
+        """Draw the visuals in the given style and compose them with existing narration"""
+        visual_assets = self._visuals_maker.generate_visuals(script, style)
+        return self._composer.compose(
+            script=script,
+            visual_assets=visual_assets,
+            audio_path=audio_path,
+            output_path=output_path,
+            citations=citations
+        )
+    
+    def _cached(self, key: str, compute):
+        """Return the cached JSON value for key, computing and storing it on a miss"""
+        value = self._cache.get(key)
+        if value is None:
+            value = compute()
+            self._cache.set(key, value)
+        else:
+            print("   (reused cached result)")
+        return value
+    
+    def _narrate(self, script: Dict) -> str:
+        """Generate narration; the narrator reuses audio already made for the same text"""
+        return self._narrator.generate_audio(script)
+    
     def _sanitize_content(self, text: str) -> str:
         """
         Remove malicious content and prompt injections
@@ -101,34 +224,59 @@ class PDFtoShortsConverter:
         Returns:
             Sanitized text
         """
-        # Patterns to detect and remove
-        malicious_patterns = [
-            r'ignore\s+(previous|all|above)\s+instructions',
-            r'disregard\s+.{0,20}instructions',
-            r'system\s*[:]\s*you\s+are',
-            r'<\s*script\s*>',
-            r'javascript\s*:',
-            r'eval\s*\(',
-            r'exec\s*\(',
-            r'__import__',
-            r'subprocess',
-            r'os\.system',
-        ]
-        
-        sanitized = text
-        for pattern in malicious_patterns:
-            sanitized = re.sub(pattern, '', sanitized, flags=re.IGNORECASE)
+        # Limit length to prevent DoS, before any regex work touches the text
+        max_length = 50000
+        truncated = len(text) > max_length
+        if truncated:
+            # End on the last sentence or line break near the cap rather than mid-word,
+            # so the script writer isn't handed a dangling fragment
+            window_start = max_length - 2000
+            cut = max(text.rfind('. ', window_start, max_length) + 1,
+                      text.rfind('\n', window_start, max_length))
+            text = text[:cut if cut > 0 else max_length]
+        
+        # Remove all malicious patterns in one scan
+        sanitized = self._remove_malicious(text)
         
         # Remove excessive newlines and whitespace
-        sanitized = re.sub(r'\n{3,}', '\n\n', sanitized)
-        sanitized = re.sub(r' {2,}', ' ', sanitized)
+        sanitized = self._MULTI_NL_RE.sub('\n\n', sanitized)
+        sanitized = self._MULTI_SP_RE.sub(' ', sanitized)
         
-        # Limit length to prevent DoS
-        max_length = 50000
-        if len(sanitized) > max_length:
-            sanitized = sanitized[:max_length] + "..."
+        if truncated:
+            sanitized += "..."
         
         return sanitized.strip()
+    
+    def _remove_malicious(self, text: str) -> str:
+        """
+        Strip every malicious pattern match from text
+        
+        When hyperscan is installed, a Hyperscan DFA pass (linear, no
+        backtracking) first checks whether anything matches at all. Clean
+        text, the common case, is returned as is; only text with a hit goes
+        through the `re` alternation, so the result never depends on
+        whether hyperscan is installed.
+        """
+        db = _hyperscan_db()
+        if db is not None and not self._hyperscan_hit(db, text):
+            return text
+        return self._MALICIOUS_RE.sub('', text)
+    
+    def _hyperscan_hit(self, db, text: str) -> bool:
+        """Whether any malicious pattern matches text (True if it can't be scanned)"""
+        try:
+            data = text.encode('utf-8')
+        except UnicodeEncodeError:  # lone surrogates: let the `re` pass decide
+            return True
+        
+        hits = []
+        
+        def on_match(pattern_id, start, end, flags, context):
+            hits.append(pattern_id)
+            return True  # One hit settles it; stop scanning
+        
+        db.scan(data, match_event_handler=on_match)
+        return bool(hits)
 
 
 def main():
@@ -6,11 +6,28 @@ import os
 import re
 import logging
 import hashlib
+import mmap
+import shutil
+import threading
+import time
+from functools import lru_cache
+from importlib.util import find_spec
+from itertools import islice
 from pathlib import Path
 from typing import List, Dict, Optional
 import subprocess
 import json
 
+try:
+    import av
+except ImportError:  # optional: media probes fall back to an ffprobe subprocess
+    av = None
+
+try:
+    import orjson
+except ImportError:  # optional: SimpleCache falls back to the stdlib json module
+    orjson = None
+
 
 # Logging setup
 def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
@@ -30,6 +47,14 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None):
 
 logger = setup_logging()
 
+# C0/C1 control characters for str.translate to delete; the whitespace ones
+# (tab, newline, ...) are left for the whitespace collapse to turn into spaces
+_CONTROL_CHARS = dict.fromkeys(
+    c for c in [*range(0x00, 0x20), *range(0x7f, 0xa0)] if not chr(c).isspace()
+)
+_WHITESPACE_RE = re.compile(r'\s+')
+_SENTENCE_END_RE = re.compile(r'[.!?]+')
+
 
 # File operations
 def ensure_directory(path: str) -> str:
@@ -54,12 +79,40 @@ def clean_directory(path: str, patterns: List[str] = None):
                 logger.warning(f"Failed to delete {file_path}: {e}")
 
 
+def prune_directory(path: str, max_files: int, pattern: str = '*'):
+    """Delete the least recently used files (by mtime) beyond the newest max_files"""
+    if not os.path.exists(path):
+        return
+    
+    files = sorted(
+        (p for p in Path(path).glob(pattern) if p.is_file()),
+        key=lambda p: p.stat().st_mtime,
+        reverse=True
+    )
+    for file_path in files[max_files:]:
+        try:
+            file_path.unlink()
+            logger.debug(f"Pruned: {file_path}")
+        except Exception as e:
+            logger.warning(f"Failed to delete {file_path}: {e}")
+
+
 def get_file_hash(file_path: str) -> str:
     """Get SHA256 hash of file"""
-    sha256_hash = hashlib.sha256()
-    
     with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        # Hash the page-cache mapping in one update: no read() copies at all
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return hashlib.sha256(mapped).hexdigest()
+        except (ValueError, OSError):  # empty file, or not mappable
+            pass
+        
+        # Python 3.11+: hash in hashlib's C loop, no per-chunk Python round-trips
+        if hasattr(hashlib, 'file_digest'):
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        sha256_hash = hashlib.sha256()
+        for byte_block in iter(lambda: f.read(1024 * 1024), b""):
             sha256_hash.update(byte_block)
     
     return sha256_hash.hexdigest()
@@ -80,23 +133,29 @@ def truncate_text(text: str, max_length: int, suffix: str = "...") -> str:
 
 def clean_text(text: str) -> str:
     """Clean and normalize text"""
-    # Remove excessive whitespace
-    text = re.sub(r'\s+', ' ', text)
-    # Remove control characters
-    text = re.sub(r'[\x00-\x1f\x7f-\x9f]', '', text)
-    return text.strip()
+    # Remove control characters, then collapse whitespace runs, in two C-level passes
+    return _WHITESPACE_RE.sub(' ', text.translate(_CONTROL_CHARS)).strip()
 
 
 def extract_sentences(text: str, max_sentences: int = None) -> List[str]:
     """Extract sentences from text"""
-    # Simple sentence splitting
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if s.strip()]
+    # Simple sentence splitting, done lazily so a limit stops the scan early
+    sentences = (s.strip() for s in _split_sentences(text))
+    sentences = (s for s in sentences if s)
     
     if max_sentences:
-        sentences = sentences[:max_sentences]
+        sentences = islice(sentences, max_sentences)
     
-    return sentences
+    return list(sentences)
+
+
+def _split_sentences(text: str):
+    """Yield the pieces of text between sentence-ending punctuation runs"""
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    yield text[start:]
 
 
 def word_count(text: str) -> int:
@@ -117,8 +176,9 @@ def estimate_speaking_time(text: str, words_per_minute: int = 150) -> float:
 
 
 # Video/Audio utilities
+@lru_cache(maxsize=1)
 def check_ffmpeg_installed() -> bool:
-    """Check if FFmpeg is installed"""
+    """Check if FFmpeg is installed (probed once per process)"""
     try:
         subprocess.run(
             ['ffmpeg', '-version'],
@@ -130,12 +190,28 @@ def check_ffmpeg_installed() -> bool:
         return False
 
 
+@lru_cache(maxsize=1)
+def _ffprobe_path() -> str:
+    """ffprobe resolved on PATH once per process (plain 'ffprobe' if not found)"""
+    return shutil.which('ffprobe') or 'ffprobe'
+
+
 def get_video_duration(video_path: str) -> float:
     """Get video duration in seconds using FFmpeg"""
+    if av is not None:
+        # Read the container header in-process instead of spawning ffprobe
+        try:
+            with av.open(video_path) as container:
+                if container.duration is None:
+                    return 0.0
+                return container.duration / av.time_base
+        except (av.error.FFmpegError, OSError):
+            return 0.0
+    
     try:
         result = subprocess.run(
             [
-                'ffprobe', '-v', 'error',
+                _ffprobe_path(), '-v', 'error',
                 '-show_entries', 'format=duration',
                 '-of', 'default=noprint_wrappers=1:nokey=1',
                 video_path
@@ -156,9 +232,16 @@ def get_audio_duration(audio_path: str) -> float:
 
 def check_video_valid(video_path: str) -> bool:
     """Check if video file is valid"""
+    if av is not None:
+        try:
+            with av.open(video_path):
+                return True
+        except (av.error.FFmpegError, OSError):
+            return False
+    
     try:
         result = subprocess.run(
-            ['ffprobe', '-v', 'error', video_path],
+            [_ffprobe_path(), '-v', 'error', video_path],
             capture_output=True,
             check=True
         )
@@ -171,14 +254,25 @@ def check_video_valid(video_path: str) -> bool:
 class ProgressTracker:
     """Simple progress tracking for console output"""
     
+    # Minimum seconds between redraws; the final step is always drawn
+    REDRAW_INTERVAL = 0.1
+    
     def __init__(self, total_steps: int, description: str = "Processing"):
         self.total_steps = total_steps
         self.current_step = 0
         self.description = description
+        self._last_redraw = float('-inf')
         
     def update(self, step_name: str = None):
         """Update progress"""
         self.current_step += 1
+        
+        # Fast loops would otherwise pay a flushed write (and a terminal repaint) per step
+        now = time.monotonic()
+        if self.current_step < self.total_steps and now - self._last_redraw < self.REDRAW_INTERVAL:
+            return
+        self._last_redraw = now
+        
         percentage = (self.current_step / self.total_steps) * 100
         
         bar_length = 30
@@ -201,29 +295,33 @@ class ProgressTracker:
 
 
 # Validation
+# Placeholder values people leave in config instead of a real API key
+_API_KEY_PLACEHOLDERS = frozenset({'your-api-key', 'xxx', 'api_key', 'key'})
+
+
 def validate_pdf_file(file_path: str) -> bool:
     """Validate PDF file"""
-    if not os.path.exists(file_path):
-        logger.error(f"File not found: {file_path}")
-        return False
-    
+    # Name check first: it needs no filesystem access
     if not file_path.lower().endswith('.pdf'):
         logger.error(f"Not a PDF file: {file_path}")
         return False
     
-    # Check file size
-    size_mb = get_file_size_mb(file_path)
-    if size_mb > 100:  # 100 MB limit
-        logger.error(f"File too large: {size_mb:.2f} MB")
-        return False
-    
-    # Check if file is readable
+    # One open serves the existence, size and header checks
     try:
         with open(file_path, 'rb') as f:
+            # Check file size
+            size_mb = os.fstat(f.fileno()).st_size / (1024 * 1024)
+            if size_mb > 100:  # 100 MB limit
+                logger.error(f"File too large: {size_mb:.2f} MB")
+                return False
+            
             header = f.read(4)
             if header != b'%PDF':
                 logger.error("Invalid PDF header")
                 return False
+    except FileNotFoundError:
+        logger.error(f"File not found: {file_path}")
+        return False
     except Exception as e:
         logger.error(f"Cannot read file: {e}")
         return False
@@ -241,8 +339,7 @@ def validate_api_key(api_key: str) -> bool:
         return False
     
     # Check for common placeholder values
-    placeholders = ['your-api-key', 'xxx', 'api_key', 'key']
-    if api_key.lower() in placeholders:
+    if api_key.lower() in _API_KEY_PLACEHOLDERS:
         return False
     
     return True
@@ -273,28 +370,47 @@ def format_file_size(bytes_size: int) -> str:
 
 
 # Cache utilities
+def _json_dumps(value) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        # Non-string keys are stringified, as the json module does
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value).encode('utf-8')
+
+
+def _json_loads(data: bytes):
+    """Parse UTF-8 JSON bytes (orjson when installed)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
 class SimpleCache:
-    """Simple file-based cache for processed results"""
+    """Simple file-based cache for processed results; entries older than max_age seconds are misses"""
     
-    def __init__(self, cache_dir: str = ".cache"):
+    def __init__(self, cache_dir: str = ".cache", max_age: Optional[float] = None):
         self.cache_dir = Path(cache_dir)
+        self.max_age = max_age
         ensure_directory(str(self.cache_dir))
     
     def get_cache_path(self, key: str) -> Path:
         """Get cache file path for key"""
-        key_hash = hashlib.md5(key.encode()).hexdigest()
+        # Not a security boundary, just a filename: 128-bit BLAKE2b is cheaper than MD5
+        key_hash = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
         return self.cache_dir / f"{key_hash}.json"
     
     def get(self, key: str) -> Optional[Dict]:
         """Get cached value"""
         cache_path = self.get_cache_path(key)
         
-        if not cache_path.exists():
+        try:
+            if self.max_age is not None and time.time() - cache_path.stat().st_mtime > self.max_age:
+                return None
+        except FileNotFoundError:
             return None
         
         try:
-            with open(cache_path, 'r') as f:
-                return json.load(f)
+            return _json_loads(cache_path.read_bytes())
         except Exception as e:
             logger.warning(f"Cache read error: {e}")
             return None
@@ -303,11 +419,15 @@ class SimpleCache:
         """Set cached value"""
         cache_path = self.get_cache_path(key)
         
+        # Write under a name unique to this writer, then swap it in: concurrent
+        # writers of one key never interleave and readers never see a partial file
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
         try:
-            with open(cache_path, 'w') as f:
-                json.dump(value, f)
+            tmp_path.write_bytes(_json_dumps(value))
+            os.replace(tmp_path, cache_path)
         except Exception as e:
             logger.warning(f"Cache write error: {e}")
+            tmp_path.unlink(missing_ok=True)
     
     def clear(self):
         """Clear all cache"""
@@ -338,15 +458,15 @@ def system_check() -> Dict[str, bool]:
     
     # Check Python packages
     required_packages = [
-        'PyPDF2', 'PIL', 'numpy', 
+        'fitz', 'PIL', 'numpy', 
         'google.generativeai', 'gtts'
     ]
     
     for package in required_packages:
+        # Locate the module without importing (and so running) it
         try:
-            __import__(package.replace('.', '_').split('_')[0])
-            checks[f'package_{package}'] = True
-        except ImportError:
+            checks[f'package_{package}'] = find_spec(package) is not None
+        except ImportError:  # a parent package is missing
             checks[f'package_{package}'] = False
     
     return checks